@@ -1,6 +1,11 @@
 import time
-from functools import lru_cache
-from typing import Dict, List, Tuple
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from math import factorial
+from operator import or_
+from typing import Dict, List, Optional, Tuple
+
+from profiling import add_profile_arguments, profile_call
 
 
 # ---------- helpers de bitboard ----------
@@ -48,10 +53,154 @@ def generate_placements_for_length(length: int, rows: int, cols: int):
     return tuple(bits_list), tuple(adj_list)
 
 
+def build_placement_index(
+    bits_arr: Tuple[int, ...], adj_arr: Tuple[int, ...], total_cells: int
+) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+    """
+    Índice célula -> bitset de colocações (bit j = colocação j do comprimento).
+    Retorna (body_index, halo_index): colocações cujo corpo / halo 'adj' cobre
+    a célula. Uma ocupação bloqueia exatamente o OR dos índices de suas células.
+    """
+    body_index = [0] * total_cells
+    halo_index = [0] * total_cells
+    for j, (b, a) in enumerate(zip(bits_arr, adj_arr, strict=True)):
+        bit = 1 << j
+        m = b
+        while m:
+            low = m & -m
+            body_index[low.bit_length() - 1] |= bit
+            m ^= low
+        m = a
+        while m:
+            low = m & -m
+            halo_index[low.bit_length() - 1] |= bit
+            m ^= low
+    return tuple(body_index), tuple(halo_index)
+
+
+# ---------- simetrias do tabuleiro ----------
+def board_symmetries(rows: int, cols: int) -> List[Tuple[int, ...]]:
+    """
+    Retorna os mapeamentos índice->índice do grupo diedral do tabuleiro.
+    Tabuleiros quadrados têm 8 simetrias; retangulares, apenas 4
+    (identidade, rot180 e as duas reflexões).
+    """
+    transforms = [
+        lambda r, c: (r, c),
+        lambda r, c: (rows - 1 - r, cols - 1 - c),
+        lambda r, c: (r, cols - 1 - c),
+        lambda r, c: (rows - 1 - r, c),
+    ]
+    if rows == cols:
+        transforms += [
+            lambda r, c: (c, rows - 1 - r),
+            lambda r, c: (cols - 1 - c, r),
+            lambda r, c: (c, r),
+            lambda r, c: (cols - 1 - c, rows - 1 - r),
+        ]
+    maps = []
+    for f in transforms:
+        mapping = [0] * (rows * cols)
+        for r in range(rows):
+            for c in range(cols):
+                rr, cc = f(r, c)
+                mapping[bit_index(r, c, cols)] = bit_index(rr, cc, cols)
+        maps.append(tuple(mapping))
+    return maps
+
+
+def make_canonicalizer(rows: int, cols: int):
+    """
+    Constrói uma função mask -> menor imagem da máscara sob as simetrias.
+    Cada simetria é aplicada byte a byte via tabelas de 256 entradas, então
+    o custo é ~ (rows*cols/8) consultas por simetria em vez de um laço por bit.
+    """
+    total = rows * cols
+    nchunks = (total + 7) // 8
+    tables = []
+    for mapping in board_symmetries(rows, cols)[1:]:
+        per_chunk = []
+        for k in range(nchunks):
+            base = 8 * k
+            table = [0] * 256
+            for byte in range(1, 256):
+                low = byte & -byte
+                j = low.bit_length() - 1
+                idx = base + j
+                bit = (1 << mapping[idx]) if idx < total else 0
+                table[byte] = table[byte ^ low] | bit
+            per_chunk.append(tuple(table))
+        tables.append(tuple(per_chunk))
+    tables = tuple(tables)
+    shifts = tuple(range(0, 8 * nchunks, 8))
+
+    def canonical(mask: int) -> int:
+        best = mask
+        for per_chunk in tables:
+            res = 0
+            for sh, table in zip(shifts, per_chunk, strict=True):
+                res |= table[(mask >> sh) & 255]
+            if res < best:
+                best = res
+        return best
+
+    return canonical
+
+
+# ---------- tabela de transposição limitada ----------
+class TranspositionTable:
+    """
+    Tabela de transposição de tamanho fixo com buckets de duas entradas.
+    - slot "depth-preferred": só é substituído por entradas de trabalho >= ao atual
+      (subárvores maiores valem mais para manter);
+    - slot "always-replace": recebe o resto, mantendo entradas recentes.
+    A memória fica limitada a 2 * size entradas.
+    """
+
+    __slots__ = ("size", "keys", "values", "works", "hits", "misses")
+
+    def __init__(self, size: int):
+        if size <= 0:
+            raise ValueError("size must be positive")
+        self.size = size
+        self.keys: List[Optional[tuple]] = [None] * (2 * size)
+        self.values: List[int] = [0] * (2 * size)
+        self.works: List[int] = [-1] * (2 * size)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple) -> Optional[int]:
+        slot = 2 * (hash(key) % self.size)
+        keys = self.keys
+        if keys[slot] == key:
+            self.hits += 1
+            return self.values[slot]
+        if keys[slot + 1] == key:
+            self.hits += 1
+            return self.values[slot + 1]
+        self.misses += 1
+        return None
+
+    def put(self, key: tuple, value: int, work: int) -> None:
+        slot = 2 * (hash(key) % self.size)
+        if work < self.works[slot]:
+            slot += 1
+        self.keys[slot] = key
+        self.values[slot] = value
+        self.works[slot] = work
+
+    def __len__(self) -> int:
+        return sum(1 for k in self.keys if k is not None)
+
+
 # ---------- contador single-thread (otimizado) ----------
-def count_fleet_configurations(
-    rows: int, cols: int, fleet: List[int], allow_touch: bool = True
-) -> int:
+def _fleet_tables(rows: int, cols: int, fleet: List[int], allow_touch: bool):
+    """
+    Tabelas compartilhadas pelos motores de DFS, alinhadas ao índice de 'lengths':
+    (lengths, counts_init, bits por comprimento, máscara de todas as colocações,
+    índice de bloqueio, kill).
+    kill[t][j][i]: colocações do tipo i bloqueadas ao pôr a colocação j do tipo t.
+    """
     # agrupa frota por comprimento
     freq: Dict[int, int] = {}
     for L in fleet:
@@ -59,84 +208,701 @@ def count_fleet_configurations(
     lengths = tuple(sorted(freq.keys()))
     counts_init = tuple(freq[L] for L in lengths)
 
-    # precompute placements alinhados ao índice de 'lengths'
+    total_cells = rows * cols
+
     placements_by_len_bits = []
-    placements_by_len_adj = []
+    blocking_index = []
     for L in lengths:
         bits_arr, adj_arr = generate_placements_for_length(L, rows, cols)
+        body_index, halo_index = build_placement_index(bits_arr, adj_arr, total_cells)
         placements_by_len_bits.append(bits_arr)
-        placements_by_len_adj.append(adj_arr)
+        # sem toque, o halo (que contém o corpo) decide o bloqueio
+        blocking_index.append(body_index if allow_touch else halo_index)
     placements_by_len_bits = tuple(placements_by_len_bits)
-    placements_by_len_adj = tuple(placements_by_len_adj)
+    all_placements = tuple((1 << len(bits)) - 1 for bits in placements_by_len_bits)
+
+    kill = tuple(
+        tuple(_blocked_by(b, blocking_index) for b in bits_arr)
+        for bits_arr in placements_by_len_bits
+    )
+    return (
+        lengths,
+        counts_init,
+        placements_by_len_bits,
+        all_placements,
+        tuple(blocking_index),
+        kill,
+    )
 
+
+def _blocked_by(mask: int, index_by_type) -> Tuple[int, ...]:
+    """OR, por tipo, dos bitsets de colocações indexados pelas células de mask."""
+    blocked = [0] * len(index_by_type)
+    m = mask
+    while m:
+        low = m & -m
+        cell = low.bit_length() - 1
+        for i, index in enumerate(index_by_type):
+            blocked[i] |= index[cell]
+        m ^= low
+    return tuple(blocked)
+
+
+def _make_counter(
+    rows: int,
+    cols: int,
+    fleet: List[int],
+    allow_touch: bool,
+    symmetry: bool,
+    table_size: Optional[int],
+):
+    """
+    Monta a DFS memoizada e retorna (dfs, branches, estimate, counts_init).
+    - branches(counts, occ): filhos do nó (colocações do tipo escolhido);
+    - estimate(counts, occ): cota superior barata do tamanho da subárvore.
+    Cada nó carrega, por comprimento, o bitset das colocações já bloqueadas;
+    contagens de candidatos saem de popcounts em vez de varrer as colocações.
+    """
+    (
+        lengths,
+        counts_init,
+        placements_by_len_bits,
+        all_placements,
+        blocking_index,
+        kill,
+    ) = _fleet_tables(rows, cols, fleet, allow_touch)
+    ntypes = len(lengths)
     total_cells = rows * cols
+    no_kill = (0,) * ntypes
 
-    @lru_cache(maxsize=None)
-    def dfs(counts_local: Tuple[int, ...], occ_mask_local: int) -> int:
-        # terminal
-        if all(c == 0 for c in counts_local):
-            return 1
-        # poda por células livres
-        free = total_cells - occ_mask_local.bit_count()
-        needed = sum(L * c for L, c in zip(lengths, counts_local, strict=True))
-        if free < needed:
-            return 0
+    def blocked_for(occ_mask_local: int) -> Tuple[int, ...]:
+        return _blocked_by(occ_mask_local, blocking_index)
+
+    canonical = make_canonicalizer(rows, cols) if symmetry else None
+    if table_size is None:
+        memo: Dict[tuple, int] = {}
+        memo_get = memo.get
+
+        def memo_put(key: tuple, value: int, work: int) -> None:
+            memo[key] = value
+
+    else:
+        table = TranspositionTable(table_size)
+        memo_get = table.get
+        memo_put = table.put
 
-        # escolhe tipo com menos colocações válidas (contagem rápida)
-        best_i = None
+    def choose_type(counts_local: Tuple[int, ...], blocked: Tuple[int, ...]) -> int:
+        """Tipo com menos colocações válidas; -1 se algum tipo não cabe mais."""
+        best_i = -1
         best_cnt = None
-        for i, (_, c) in enumerate(zip(lengths, counts_local, strict=False)):
+        for i, c in enumerate(counts_local):
             if c == 0:
                 continue
-            bits_arr = placements_by_len_bits[i]
-            adj_arr = placements_by_len_adj[i]
-            cnt = 0
-            if allow_touch:
-                for b in bits_arr:
-                    if (b & occ_mask_local) == 0:
-                        cnt += 1
-            else:
-                for b, a in zip(bits_arr, adj_arr, strict=True):
-                    if (b & occ_mask_local) == 0 and (a & occ_mask_local) == 0:
-                        cnt += 1
+            cnt = (all_placements[i] & ~blocked[i]).bit_count()
             if cnt == 0:
-                return 0
+                return -1
             if best_cnt is None or cnt < best_cnt:
                 best_cnt = cnt
                 best_i = i
                 if cnt == 1:
                     break
+        return best_i
 
-        # expande apenas o tipo escolhido (segunda passagem, sem alocar listas)
-        total = 0
-        if best_i is None:
+    def _dfs(
+        counts_local: Tuple[int, ...],
+        occ_mask_local: int,
+        parent_blocked: Tuple[int, ...],
+        placed_kill: Tuple[int, ...],
+    ) -> int:
+        # terminal
+        if all(c == 0 for c in counts_local):
+            return 1
+        # poda por células livres
+        free = total_cells - occ_mask_local.bit_count()
+        needed = sum(L * c for L, c in zip(lengths, counts_local, strict=True))
+        if free < needed:
             return 0
+
+        key = (
+            counts_local,
+            canonical(occ_mask_local) if canonical is not None else occ_mask_local,
+        )
+        cached = memo_get(key)
+        if cached is not None:
+            return cached
+
+        # bloqueios só são combinados após a consulta à memo
+        blocked = tuple(map(or_, parent_blocked, placed_kill))
+
+        # escolhe tipo com menos colocações válidas (popcount dos bitsets)
+        best_i = choose_type(counts_local, blocked)
+        if best_i < 0:
+            memo_put(key, 0, needed)
+            return 0
+
+        # expande só as colocações livres do tipo escolhido
+        total = 0
         bits_arr = placements_by_len_bits[best_i]
-        adj_arr = placements_by_len_adj[best_i]
+        kill_arr = kill[best_i]
         counts_list = list(counts_local)
-        for b, a in zip(bits_arr, adj_arr, strict=True):
-            if (b & occ_mask_local) != 0:
+        counts_list[best_i] -= 1
+        child_counts = tuple(counts_list)
+        free_pl = all_placements[best_i] & ~blocked[best_i]
+        while free_pl:
+            low = free_pl & -free_pl
+            j = low.bit_length() - 1
+            free_pl ^= low
+            total += _dfs(
+                child_counts, occ_mask_local | bits_arr[j], blocked, kill_arr[j]
+            )
+        memo_put(key, total, needed)
+        return total
+
+    def dfs(counts_local: Tuple[int, ...], occ_mask_local: int) -> int:
+        return _dfs(counts_local, occ_mask_local, blocked_for(occ_mask_local), no_kill)
+
+    def branches(
+        counts_local: Tuple[int, ...], occ_mask_local: int
+    ) -> List[Tuple[Tuple[int, ...], int]]:
+        blocked = blocked_for(occ_mask_local)
+        best_i = choose_type(counts_local, blocked)
+        if best_i < 0:
+            return []
+        counts_list = list(counts_local)
+        counts_list[best_i] -= 1
+        child_counts = tuple(counts_list)
+        bits_arr = placements_by_len_bits[best_i]
+        children = []
+        free_pl = all_placements[best_i] & ~blocked[best_i]
+        while free_pl:
+            low = free_pl & -free_pl
+            children.append(
+                (child_counts, occ_mask_local | bits_arr[low.bit_length() - 1])
+            )
+            free_pl ^= low
+        return children
+
+    def estimate(counts_local: Tuple[int, ...], occ_mask_local: int) -> int:
+        blocked = blocked_for(occ_mask_local)
+        est = 1
+        for i, c in enumerate(counts_local):
+            if c:
+                est *= (all_placements[i] & ~blocked[i]).bit_count() ** c
+        return est
+
+    return dfs, branches, estimate, counts_init
+
+
+# estado por processo do pool (montado uma vez pelo initializer)
+_worker_dfs = None
+
+
+def _init_worker(
+    rows: int,
+    cols: int,
+    fleet: List[int],
+    allow_touch: bool,
+    symmetry: bool,
+    table_size: Optional[int],
+) -> None:
+    global _worker_dfs
+    _worker_dfs = _make_counter(rows, cols, fleet, allow_touch, symmetry, table_size)[0]
+
+
+def _count_branch(state: Tuple[Tuple[int, ...], int]) -> int:
+    return _worker_dfs(*state)
+
+
+def count_fleet_configurations(
+    rows: int,
+    cols: int,
+    fleet: List[int],
+    allow_touch: bool = True,
+    symmetry: bool = False,
+    table_size: Optional[int] = None,
+    workers: int = 1,
+    split_depth: int = 1,
+) -> int:
+    """
+    Conta as configurações da frota (navios de mesmo comprimento são contados
+    em ordem, como na DFS original).
+    - symmetry=True: a memo usa a forma canônica da ocupação sob as simetrias
+      do tabuleiro, juntando estados rotacionados/refletidos em uma entrada.
+    - table_size: limita a memo a uma TranspositionTable de 2*table_size
+      entradas; None mantém a memo ilimitada.
+    - workers > 1: os ramos até a profundidade split_depth particionam a
+      contagem e são distribuídos num pool de processos (cada processo com a
+      própria memo), maiores subárvores estimadas primeiro; estados repetidos
+      na fronteira são contados uma vez e multiplicados.
+    """
+    dfs, branches, estimate, counts_init = _make_counter(
+        rows, cols, fleet, allow_touch, symmetry, table_size
+    )
+    if workers <= 1:
+        return dfs(counts_init, 0)
+
+    # expande a raiz até split_depth; folhas terminais ficam no lote.
+    # Estados repetidos (mesmos navios em outra ordem ou, com symmetry, a
+    # mesma ocupação a menos de simetria) viram um só, com multiplicidade.
+    canonical = make_canonicalizer(rows, cols) if symmetry else None
+    frontier: Dict[Tuple[Tuple[int, ...], int], int] = {(counts_init, 0): 1}
+    for _ in range(max(1, split_depth)):
+        nxt: Dict[Tuple[Tuple[int, ...], int], int] = {}
+        for (counts_local, occ), mult in frontier.items():
+            if all(c == 0 for c in counts_local):
+                children = [(counts_local, occ)]
+            else:
+                children = branches(counts_local, occ)
+            for child_counts, child_occ in children:
+                if canonical is not None:
+                    child_occ = canonical(child_occ)
+                key = (child_counts, child_occ)
+                nxt[key] = nxt.get(key, 0) + mult
+        frontier = nxt
+    states = sorted(frontier, key=lambda st: estimate(*st), reverse=True)
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(rows, cols, fleet, allow_touch, symmetry, table_size),
+    ) as pool:
+        counts = pool.map(_count_branch, states, chunksize=1)
+        return sum(frontier[st] * c for st, c in zip(states, counts, strict=True))
+
+
+# ---------- mapa de calor (contagem por célula) ----------
+class FleetHeatmap:
+    """
+    Mapa de calor reutilizável entre tiros, pela DP de perfil
+    (count_fleet_configurations_profile) para frente e para trás.
+    - para frente: F(s) = número de prefixos que chegam ao estado s; guardam-se
+      só as camadas no início de cada coluna (checkpoints)
+    - para trás: B(s) = número de completamentos de s, também guardado no
+      início de cada coluna
+    A célula decidida no passo (r, c) contribui F(s) * B(t) em cada transição
+    s -> t que a ocupa; uma coluna sai das transições das suas R camadas,
+    geradas uma vez a partir de F e percorridas de volta a partir de B.
+    Tiros certeiros (hits) e na água (misses) restringem a célula e podam os
+    estados. Um tiro na coluna j (da varredura) só invalida F depois de j e B
+    até j: o recálculo vai de j para a frente com os B guardados e de j para
+    trás com os F guardados, passando uma vez por coluna. A memória fica em
+    2 (C + 1) checkpoints + as transições de uma coluna.
+    Tamanhos atendidos: um tiro custa ~0,2 s em 7x7 (frota [4, 3, 2]) e
+    ~2 s em 8x8 ([4, 3, 2, 2]); na frota clássica em 10x10 passa de um minuto
+    e ~1,5 GB, então o uso a cada tiro vai até 8x8 (tests/test_battleship.py
+    limita o tempo por tiro).
+    """
+
+    __slots__ = (
+        "rows", "cols", "fleet", "allow_touch", "hits", "misses", "_R", "_C",
+        "_transposed", "_counts_init", "_order", "_successors", "_checkpoints",
+        "_completions",
+    )  # fmt: skip
+
+    def __init__(
+        self,
+        rows: int,
+        cols: int,
+        fleet: List[int],
+        allow_touch: bool = True,
+        hits: int = 0,
+        misses: int = 0,
+    ):
+        self.rows = rows
+        self.cols = cols
+        self.fleet = list(fleet)
+        self.allow_touch = allow_touch
+        self.hits = hits
+        self.misses = misses
+        lengths, counts_init = _fleet_lengths(fleet)
+        # mesma transposição do contador por perfil: fronteira no lado menor
+        self._R, self._C = min(rows, cols), max(rows, cols)
+        self._transposed = rows > cols
+        self._counts_init = counts_init
+        self._order = 1
+        for k in counts_init:
+            self._order *= factorial(k)
+        self._successors = _make_profile_stepper(self._R, self._C, lengths, allow_touch)
+        # _checkpoints[c]: camada F antes da coluna c da varredura
+        self._checkpoints: List[Dict[tuple, int]] = [
+            {((0,) * self._R, 0, False, counts_init): 1}
+        ]
+        # _completions[c]: camada B antes da coluna c (None: invalidada)
+        self._completions: List[Optional[Dict[tuple, int]]] = [None] * (self._C + 1)
+
+    def _scan_pos(self, r: int, c: int) -> Tuple[int, int]:
+        return (c, r) if self._transposed else (r, c)
+
+    def shoot(self, r: int, c: int, hit: bool) -> None:
+        """Registra um tiro em (r, c) e invalida o que dependia da célula."""
+        if not (0 <= r < self.rows and 0 <= c < self.cols):
+            raise ValueError(f"cell out of board: ({r}, {c})")
+        bit = 1 << bit_index(r, c, self.cols)
+        if hit:
+            self.hits |= bit
+        else:
+            self.misses |= bit
+        sc = self._scan_pos(r, c)[1]
+        del self._checkpoints[sc + 1 :]
+        self._completions[: sc + 1] = [None] * (sc + 1)
+
+    def _step_rules(self) -> Tuple[List[int], List[int], List[int]]:
+        """
+        Por passo k = c * R + r da varredura: regra da célula (0 livre, 1 na
+        água, 2 certeiro), células utilizáveis e tiros certeiros depois dela.
+        """
+        R, C = self._R, self._C
+        rule = [0] * (R * C)
+        for r in range(self.rows):
+            for c in range(self.cols):
+                bit = 1 << bit_index(r, c, self.cols)
+                pr, pc = self._scan_pos(r, c)
+                if self.misses & bit:
+                    rule[pc * R + pr] = 1
+                elif self.hits & bit:
+                    rule[pc * R + pr] = 2
+        remaining = [0] * (R * C)
+        hits_ahead = [0] * (R * C)
+        usable = hits = 0
+        for k in range(R * C - 1, -1, -1):
+            remaining[k] = usable
+            hits_ahead[k] = hits
+            usable += rule[k] != 1
+            hits += rule[k] == 2
+        return rule, remaining, hits_ahead
+
+    def _advance(self, states: Dict[tuple, int], r: int, c: int, rules) -> dict:
+        k = c * self._R + r
+        rule, remaining, hits_ahead = rules
+        successors = self._successors
+        nxt: Dict[tuple, int] = {}
+        get = nxt.get
+        for state, ways in states.items():
+            for _, key in successors(state, r, c, rule[k], remaining[k], hits_ahead[k]):
+                nxt[key] = get(key, 0) + ways
+        return nxt
+
+    def _column(self, states: Dict[tuple, int], c: int, rules):
+        """
+        Varre a coluna c a partir da camada F do seu início. Devolve, por
+        linha, (F de cada estado, transições de cada estado) e a camada F do
+        início da coluna c+1. Uma transição é o índice do estado seguinte na
+        linha de baixo (~índice se ocupa a célula): só inteiros ficam
+        guardados, as chaves das linhas intermediárias são liberadas.
+        """
+        k = c * self._R
+        rule, remaining, hits_ahead = rules
+        successors = self._successors
+        layers = []
+        items = states.items()
+        for r in range(self._R):
+            index: Dict[tuple, int] = {}
+            ways_next: List[int] = []
+            ways_col = []
+            moves = []
+            for state, ways in items:
+                ids = []
+                for occupied, key in successors(
+                    state, r, c, rule[k], remaining[k], hits_ahead[k]
+                ):
+                    i = index.get(key)
+                    if i is None:
+                        i = index[key] = len(ways_next)
+                        ways_next.append(ways)
+                    else:
+                        ways_next[i] += ways
+                    ids.append(~i if occupied else i)
+                ways_col.append(ways)
+                moves.append(ids)
+            layers.append((ways_col, moves))
+            items = zip(index, ways_next, strict=True)
+            k += 1
+        return layers, dict(items)
+
+    def _column_back(self, states, layers, nxt, back: Dict[tuple, int], c, heat):
+        """
+        Percorre de volta as camadas de _column (states: F do início da
+        coluna, nxt: F do início da seguinte, back: B de nxt); devolve B do
+        início da coluna.
+        """
+        bw = [back.get(s, 0) for s in nxt]
+        for r in range(self._R - 1, -1, -1):
+            ways_col, moves = layers[r]
+            cur = []
+            mass = 0
+            for f, ids in zip(ways_col, moves, strict=True):
+                total = 0
+                occupied_total = 0
+                for i in ids:
+                    if i < 0:
+                        b = bw[~i]
+                        total += b
+                        occupied_total += b
+                    else:
+                        total += bw[i]
+                cur.append(total)
+                if occupied_total:
+                    mass += f * occupied_total
+            rr, cc = (c, r) if self._transposed else (r, c)
+            heat[rr][cc] = mass * self._order
+            bw = cur
+        return {s: b for s, b in zip(states, bw, strict=True) if b}
+
+    def compute(self) -> Tuple[int, List[List[int]]]:
+        """(total, heat) para os tiros registrados até agora."""
+        heat = [[0] * self.cols for _ in range(self.rows)]
+        if self.hits & self.misses:
+            return 0, heat
+        C = self._C
+        rules = self._step_rules()
+        cps = self._checkpoints
+        bcps = self._completions
+
+        # primeira coluna j com B válido depois dela (B_C sai da última coluna)
+        j = C - 1
+        while j > 0 and bcps[j] is not None:
+            j -= 1
+        # F até o início de j, sem mapa (só quando nenhum B serve antes)
+        while len(cps) <= j:
+            c = len(cps) - 1
+            states = cps[c]
+            for r in range(self._R):
+                states = self._advance(states, r, c, rules)
+            cps.append(states)
+
+        # de j para a frente: F novo, B guardado
+        zero = (0,) * len(self._counts_init)
+        for c in range(j, C):
+            layers, nxt = self._column(cps[c], c, rules)
+            del cps[c + 1 :]
+            cps.append(nxt)
+            if c == C - 1:
+                bcps[C] = {s: 1 for s in nxt if s[3] == zero}
+            bcps[c] = self._column_back(cps[c], layers, nxt, bcps[c + 1], c, heat)
+        # de j para trás: F guardado, B novo
+        for c in range(j - 1, -1, -1):
+            layers, nxt = self._column(cps[c], c, rules)
+            bcps[c] = self._column_back(cps[c], layers, nxt, bcps[c + 1], c, heat)
+
+        total = sum(bcps[0].values()) * self._order
+        return total, heat
+
+
+def fleet_heatmap(
+    rows: int,
+    cols: int,
+    fleet: List[int],
+    hits: int = 0,
+    misses: int = 0,
+    allow_touch: bool = True,
+) -> Tuple[int, List[List[int]]]:
+    """
+    Retorna (total, heat), onde heat[r][c] é o número de configurações
+    (mesma convenção de count_fleet_configurations) que ocupam a célula (r, c),
+    dadas as máscaras de tiros certeiros (hits) e na água (misses).
+    Para recalcular a cada tiro, use FleetHeatmap e shoot().
+    """
+    return FleetHeatmap(rows, cols, fleet, allow_touch, hits, misses).compute()
+
+
+# ---------- contador por perfil (transfer-matrix / broken profile) ----------
+def _fleet_lengths(fleet: List[int]) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+    """(comprimentos distintos em ordem, quantidade de navios de cada um)."""
+    freq: Dict[int, int] = {}
+    for L in fleet:
+        freq[L] = freq.get(L, 0) + 1
+    lengths = tuple(sorted(freq.keys()))
+    return lengths, tuple(freq[L] for L in lengths)
+
+
+def _make_profile_stepper(R: int, C: int, lengths: Tuple[int, ...], allow_touch: bool):
+    """
+    Transições da DP de perfil num tabuleiro R x C varrido coluna a coluna.
+    Estado: (fronteira, vertical em curso, diagonal, frota restante), onde cada
+    posição da fronteira vale 0 (vazia), -1 (ocupada, sem continuação) ou k > 0
+    (navio horizontal que ainda precisa de k células à direita).
+    'diagonal' guarda a ocupação da célula (r-1, c-1), já sobrescrita na
+    fronteira, necessária para a regra sem toque. Com toque permitido, -1 e a
+    diagonal não influem em nada e são normalizados para 0/False (menos estados).
+
+    Retorna successors(state, r, c, rule, remaining, hits_ahead) ->
+    [(célula ocupada, próximo estado)] para a célula (r, c):
+    - rule: 0 livre, 1 tem que ficar vazia (água), 2 tem que ser ocupada
+    - poda: as células que ainda serão ocupadas cabem nas remaining células
+      utilizáveis seguintes e cobrem os hits_ahead tiros certeiros seguintes
+    """
+    # células que a frota restante ocupa / que a fronteira ainda deve ocupar
+    cells_needed: Dict[Tuple[int, ...], int] = {}
+    front_pending: Dict[Tuple[int, ...], int] = {}
+
+    def successors(
+        state: tuple, r: int, c: int, rule: int, remaining: int, hits_ahead: int
+    ) -> List[Tuple[bool, tuple]]:
+        front, vert, diag, counts = state
+        last_row = r + 1 == R
+        left = front[r]
+        up = front[r - 1] if r > 0 else 0
+        down_left = front[r + 1] if not last_row else 0
+        new_diag = (left != 0) if not (last_row or allow_touch) else False
+
+        if left > 0 and vert > 0:
+            return []
+        need = cells_needed.get(counts)
+        if need is None:
+            need = sum(L * k for L, k in zip(lengths, counts, strict=True))
+            cells_needed[counts] = need
+        pending = front_pending.get(front)
+        if pending is None:
+            pending = front_pending[front] = sum(v for v in front if v > 0)
+        # células a ocupar depois desta, se ela ficar vazia
+        base = need + pending - (left if left > 0 else 0)
+        # (status da célula, vertical restante, frota restante, células depois)
+        options: List[Tuple[int, int, Tuple[int, ...], int]] = []
+        if left > 0:
+            # continuação horizontal obrigatória
+            if not allow_touch and (up or diag or down_left):
+                return []
+            status = left - 1 if left > 1 else -1
+            options.append((status, 0, counts, base + (status if status > 0 else 0)))
+        elif vert > 0:
+            # continuação vertical obrigatória
+            if not allow_touch and (left or diag or down_left):
+                return []
+            options.append((-1, vert - 1, counts, base + vert - 1))
+        else:
+            options.append((0, 0, counts, base))
+            if allow_touch or not (up or diag or left or down_left):
+                # um navio novo tira L da frota e deixa L - 1 células pendentes
+                placed = base - 1
+                counts_list = list(counts)
+                for i, L in enumerate(lengths):
+                    if counts_list[i] == 0:
+                        continue
+                    counts_list[i] -= 1
+                    new_counts = tuple(counts_list)
+                    counts_list[i] += 1
+                    if L == 1:
+                        options.append((-1, 0, new_counts, placed))
+                        continue
+                    if c + L <= C:
+                        options.append((L - 1, 0, new_counts, placed))
+                    if r + L <= R:
+                        options.append((-1, L - 1, new_counts, placed))
+
+        out = []
+        for status, new_vert, new_counts, cells in options:
+            if rule and (status != 0) != (rule == 2):
                 continue
-            if not allow_touch and (a & occ_mask_local) != 0:
+            # poda: células restantes precisam comportar o que falta
+            if cells > remaining or cells < hits_ahead:
                 continue
-            counts_list[best_i] -= 1
-            total += dfs(tuple(counts_list), occ_mask_local | b)
-            counts_list[best_i] += 1
-        return total
+            stored = 0 if allow_touch and status < 0 else status
+            new_front = front[:r] + (stored,) + front[r + 1 :]
+            out.append((status != 0, (new_front, new_vert, new_diag, new_counts)))
+        return out
 
-    return dfs(counts_init, 0)
+    return successors
 
 
-# ---------- exemplo ----------
-if __name__ == "__main__":
-    rows, cols = 10, 10
-    fleet = [5, 4, 3, 2]
-    allow_touch = True
+def count_fleet_configurations_profile(
+    rows: int, cols: int, fleet: List[int], allow_touch: bool = True
+) -> int:
+    """
+    Mesma contagem de count_fleet_configurations, mas por DP de perfil:
+    varre o tabuleiro coluna a coluna, célula a célula, mantendo só a fronteira
+    (estados e transições em _make_profile_stepper).
+    O tabuleiro é transposto para que a fronteira fique no lado menor; o custo
+    é linear no número de colunas varridas.
+    """
+    lengths, counts_init = _fleet_lengths(fleet)
+
+    # transpor não altera a contagem (horizontais <-> verticais)
+    R, C = min(rows, cols), max(rows, cols)
+    total_cells = R * C
+    successors = _make_profile_stepper(R, C, lengths, allow_touch)
+
+    states: Dict[tuple, int] = {((0,) * R, 0, False, counts_init): 1}
+    processed = 0
+    for c in range(C):
+        for r in range(R):
+            processed += 1
+            remaining = total_cells - processed
+            nxt: Dict[tuple, int] = {}
+            get = nxt.get
+            for state, ways in states.items():
+                for _, key in successors(state, r, c, 0, remaining, 0):
+                    nxt[key] = get(key, 0) + ways
+            states = nxt
+
+    zero = (0,) * len(lengths)
+    total = sum(ways for (_, _, _, counts), ways in states.items() if counts == zero)
+    # a DFS conta navios de mesmo comprimento em ordem
+    for k in counts_init:
+        total *= factorial(k)
+    return total
+
+
+# ---------- CLI ----------
+def main() -> None:
+    p = ArgumentParser()
+    p.add_argument("--rows", type=int, default=10)
+    p.add_argument("--cols", type=int, default=10)
+    p.add_argument("--fleet", type=str, default="5,4,3,2")
+    p.add_argument("--no-touch", action="store_true")
+    p.add_argument("--engine", choices=("dfs", "profile"), default="dfs")
+    p.add_argument("--symmetry", action="store_true")
+    p.add_argument("--table-size", type=int, default=None)
+    p.add_argument("--workers", type=int, default=1)
+    p.add_argument("--split-depth", type=int, default=1)
+    p.add_argument("--heatmap", action="store_true", help="print per-cell odds")
+    add_profile_arguments(p)
+    args = p.parse_args()
+    if args.profile:
+        profile_call(
+            _run,
+            args,
+            mode=args.profile,
+            out=args.profile_out,
+            top=args.profile_top,
+        )
+    else:
+        _run(args)
+
+
+def _run(args) -> None:
+    fleet = [int(x) for x in args.fleet.split(",") if x.strip()]
+    allow_touch = not args.no_touch
 
     # ajuste conforme capacidade da sua máquina
-    print(f"Tabuleiro: {rows}x{cols}, frota: {fleet}, allow_touch={allow_touch}")
+    print(
+        f"Tabuleiro: {args.rows}x{args.cols}, frota: {fleet}, allow_touch={allow_touch}"
+    )
     t0 = time.perf_counter()
-    total = count_fleet_configurations(rows, cols, fleet, allow_touch=allow_touch)
+    if args.heatmap:
+        total, heat = fleet_heatmap(
+            args.rows, args.cols, fleet, allow_touch=allow_touch
+        )
+        for row in heat:
+            print(" ".join(f"{(v / total if total else 0.0):5.3f}" for v in row))
+    elif args.engine == "profile":
+        total = count_fleet_configurations_profile(
+            args.rows, args.cols, fleet, allow_touch=allow_touch
+        )
+    else:
+        total = count_fleet_configurations(
+            args.rows,
+            args.cols,
+            fleet,
+            allow_touch=allow_touch,
+            symmetry=args.symmetry,
+            table_size=args.table_size,
+            workers=args.workers,
+            split_depth=args.split_depth,
+        )
     t1 = time.perf_counter()
     print(f"Configurações: {total}")
     print(f"Tempo: {t1 - t0:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Unified benchmark suite.
+
+Benchmarks live in the `suite_*` modules of this package and register
+themselves with `@benchmark`. The decorated function is a factory: it does
+the (untimed) setup and returns the zero-argument callable that is timed.
+
+    python -m bench run [-k FILTER] [--out results.json]
+                        [--baseline base.json] [--threshold 0.1]
+                        [--caches keep|cold|warm] [--warm-file snapshot.json]
+"""
+
+from bench.registry import (
+    BENCHMARKS,
+    CACHE_PROVIDERS,
+    Benchmark,
+    benchmark,
+    cache_provider,
+    discover,
+)
+from bench.runner import (
+    compare,
+    environment,
+    load_results,
+    prepare_caches,
+    run_all,
+    run_benchmark,
+    write_results,
+)
+
+__all__ = [
+    "BENCHMARKS",
+    "CACHE_PROVIDERS",
+    "Benchmark",
+    "benchmark",
+    "cache_provider",
+    "compare",
+    "discover",
+    "environment",
+    "load_results",
+    "prepare_caches",
+    "run_all",
+    "run_benchmark",
+    "write_results",
+]
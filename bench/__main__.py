@@ -0,0 +1,84 @@
+import sys
+from argparse import ArgumentParser
+
+from bench.registry import discover
+from bench.runner import compare, load_results, run_all, write_results
+
+
+def _fmt(seconds: float) -> str:
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3f}{unit}"
+    return f"{seconds / 1e-9:.1f}ns"
+
+
+def _print_result(res: dict) -> None:
+    print(
+        f"{res['name']:<40} median={_fmt(res['median']):>10} "
+        f"p95={_fmt(res['p95']):>10} iters={res['iterations']}",
+        flush=True,
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    p = ArgumentParser(prog="python -m bench")
+    sub = p.add_subparsers(dest="cmd", required=True)
+
+    sub.add_parser("list", help="list registered benchmarks")
+
+    run = sub.add_parser("run", help="run benchmarks and write JSON results")
+    run.add_argument(
+        "-k", action="append", default=[], help="name filter (glob or substring)"
+    )
+    run.add_argument("--out", default=None, help="write JSON results here")
+    run.add_argument("--baseline", default=None, help="baseline JSON to compare")
+    run.add_argument(
+        "--threshold", type=float, default=0.10, help="relative regression limit"
+    )
+    run.add_argument("--min-time", type=float, default=0.5)
+    run.add_argument("--max-samples", type=int, default=10_000)
+    run.add_argument("--warmup", type=int, default=2)
+    run.add_argument(
+        "--caches",
+        choices=("keep", "cold", "warm"),
+        default="keep",
+        help="cache state before each benchmark",
+    )
+    run.add_argument("--warm-file", default=None, help="snapshot for --caches warm")
+    args = p.parse_args(argv)
+
+    if args.cmd == "list":
+        for name, b in sorted(discover().items()):
+            print(f"{name:<40} [{b.group}]")
+        return 0
+
+    report = run_all(
+        args.k,
+        progress=_print_result,
+        min_time=args.min_time,
+        max_samples=args.max_samples,
+        warmup=args.warmup,
+        caches=args.caches,
+        warm_file=args.warm_file,
+    )
+    if args.out:
+        write_results(args.out, report)
+
+    if args.baseline:
+        rows = compare(report, load_results(args.baseline), args.threshold)
+        print()
+        regressions = 0
+        for row in rows:
+            if row["status"] == "new":
+                print(f"{row['name']:<40} new")
+                continue
+            print(f"{row['name']:<40} {row['ratio']:6.2f}x  {row['status']}")
+            regressions += row["status"] == "regression"
+        if regressions:
+            print(f"\n{regressions} regression(s) above {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
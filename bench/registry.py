@@ -0,0 +1,73 @@
+import importlib
+import pkgutil
+from typing import Callable
+
+# factory() -> zero-argument callable to time
+Factory = Callable[[], Callable[[], object]]
+
+
+class Benchmark:
+    __slots__ = ("name", "group", "factory", "setup_each")
+
+    def __init__(
+        self,
+        name: str,
+        group: str,
+        factory: Factory,
+        setup_each: Callable[[], None] | None = None,
+    ):
+        self.name = name
+        self.group = group
+        self.factory = factory
+        # called (untimed) before every sample, e.g. to start from cold caches
+        self.setup_each = setup_each
+
+
+BENCHMARKS: dict[str, Benchmark] = {}
+
+
+def benchmark(
+    name: str, group: str | None = None, setup_each: Callable[[], None] | None = None
+):
+    """Register a benchmark factory under `name` (group defaults to its prefix)."""
+
+    def deco(factory: Factory) -> Factory:
+        if name in BENCHMARKS:
+            raise ValueError(f"duplicate benchmark: {name}")
+        BENCHMARKS[name] = Benchmark(
+            name, group or name.split(".", 1)[0], factory, setup_each
+        )
+        return factory
+
+    return deco
+
+
+class CacheProvider:
+    """Cache controls of one module (clear, stats, and optionally warm/snapshot)."""
+
+    __slots__ = ("name", "clear", "stats", "warm", "snapshot")
+
+    def __init__(self, name, clear, stats, warm=None, snapshot=None):
+        self.name = name
+        self.clear = clear
+        self.stats = stats
+        self.warm = warm
+        self.snapshot = snapshot
+
+
+CACHE_PROVIDERS: dict[str, CacheProvider] = {}
+
+
+def cache_provider(name: str, clear, stats, warm=None, snapshot=None) -> None:
+    """Expose a module's caches so runs can start cold or from a snapshot."""
+    CACHE_PROVIDERS[name] = CacheProvider(name, clear, stats, warm, snapshot)
+
+
+def discover() -> dict[str, Benchmark]:
+    """Import every `bench.suite_*` module so its benchmarks register."""
+    import bench
+
+    for info in pkgutil.iter_modules(bench.__path__):
+        if info.name.startswith("suite_"):
+            importlib.import_module(f"bench.{info.name}")
+    return BENCHMARKS
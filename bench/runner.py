@@ -0,0 +1,224 @@
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from datetime import datetime, timezone
+from fnmatch import fnmatch
+from time import perf_counter
+
+from bench.registry import CACHE_PROVIDERS, Benchmark, discover
+
+# a sample repeats the callable until it takes at least this long, so timer
+# resolution does not dominate very fast benchmarks
+MIN_SAMPLE_TIME = 1e-3
+
+
+def _calibrate(fn) -> int:
+    """Number of calls per sample so that one sample >= MIN_SAMPLE_TIME."""
+    loops = 1
+    while True:
+        t0 = perf_counter()
+        for _ in range(loops):
+            fn()
+        dt = perf_counter() - t0
+        if dt >= MIN_SAMPLE_TIME or loops >= 1 << 20:
+            return loops
+        loops *= 2 if dt == 0 else max(2, min(10, int(MIN_SAMPLE_TIME / dt) + 1))
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    """Linear-interpolated percentile (q in [0, 1]) of an already sorted list."""
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    pos = q * (len(sorted_values) - 1)
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+def run_benchmark(
+    bench: Benchmark,
+    min_time: float = 0.5,
+    max_samples: int = 10_000,
+    min_samples: int = 5,
+    warmup: int = 2,
+) -> dict:
+    """Time one benchmark; all reported times are seconds per call.
+
+    - `warmup` untimed calls, then samples of `loops` calls each (loops is
+      calibrated so a sample lasts >= MIN_SAMPLE_TIME)
+    - Sampling stops after `min_time` seconds of timed work (but not before
+      `min_samples` samples) or at `max_samples`
+    """
+    fn = bench.factory()
+    setup = bench.setup_each
+    for _ in range(warmup):
+        if setup is not None:
+            setup()
+        fn()
+    # per-sample setup (cold caches) only makes sense one call at a time
+    loops = 1 if setup is not None else _calibrate(fn)
+
+    samples = []
+    total = 0.0
+    while len(samples) < max_samples and (
+        total < min_time or len(samples) < min_samples
+    ):
+        if setup is not None:
+            setup()
+        t0 = perf_counter()
+        for _ in range(loops):
+            fn()
+        dt = perf_counter() - t0
+        total += dt
+        samples.append(dt / loops)
+
+    ordered = sorted(samples)
+    return {
+        "name": bench.name,
+        "group": bench.group,
+        "samples": len(samples),
+        "iterations": len(samples) * loops,
+        "loops": loops,
+        "median": statistics.median(ordered),
+        "p95": _percentile(ordered, 0.95),
+        "mean": statistics.fmean(ordered),
+        "min": ordered[0],
+        "stdev": statistics.pstdev(ordered) if len(ordered) > 1 else 0.0,
+        "total": total,
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            timeout=5,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def environment() -> dict:
+    """Machine/interpreter description stored next to the results."""
+    try:
+        import numpy
+
+        numpy_version = numpy.__version__
+    except ImportError:
+        numpy_version = None
+    try:
+        import gmpy2
+
+        gmpy2_version = gmpy2.version()
+    except ImportError:
+        gmpy2_version = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "numpy": numpy_version,
+        "gmpy2": gmpy2_version,
+        "commit": _git_commit(),
+    }
+
+
+def prepare_caches(mode: str = "keep", warm_file: str | None = None) -> None:
+    """keep: leave caches alone; cold: clear them; warm: clear, then load warm_file."""
+    if mode == "keep":
+        return
+    if mode not in ("cold", "warm"):
+        raise ValueError(f"unknown cache mode: {mode!r}")
+    if mode == "warm" and warm_file is None:
+        raise ValueError("cache mode 'warm' needs a snapshot file")
+    for provider in CACHE_PROVIDERS.values():
+        provider.clear()
+        if mode == "warm" and provider.warm is not None:
+            provider.warm(warm_file)
+
+
+def run_all(
+    patterns: list[str] | None = None,
+    progress=None,
+    caches: str = "keep",
+    warm_file: str | None = None,
+    **kwargs,
+) -> dict:
+    """Discover and run every benchmark whose name matches one of `patterns`.
+
+    `caches` ("keep", "cold" or "warm" from `warm_file`) sets the state of
+    every registered cache before each benchmark; the cache statistics after
+    the run are stored with its result.
+    """
+    benches = discover()
+    selected = [
+        b
+        for name, b in sorted(benches.items())
+        if not patterns or any(fnmatch(name, p) or p in name for p in patterns)
+    ]
+    results = []
+    for b in selected:
+        prepare_caches(caches, warm_file)
+        res = run_benchmark(b, **kwargs)
+        res["caches"] = {name: p.stats() for name, p in CACHE_PROVIDERS.items()}
+        results.append(res)
+        if progress is not None:
+            progress(res)
+    env = environment()
+    env["caches"] = caches
+    return {"environment": env, "results": results}
+
+
+def write_results(path: str, report: dict) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+    os.replace(tmp, path)
+
+
+def load_results(path: str) -> dict:
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def compare(report: dict, baseline: dict, threshold: float = 0.10) -> list[dict]:
+    """Compare medians against a baseline report.
+
+    A benchmark regresses when its median is more than `threshold` (relative)
+    slower than the baseline median and improves when it is that much faster.
+    """
+    base = {r["name"]: r for r in baseline.get("results", [])}
+    rows = []
+    for r in report["results"]:
+        old = base.get(r["name"])
+        if old is None:
+            rows.append({"name": r["name"], "status": "new", "median": r["median"]})
+            continue
+        ratio = r["median"] / old["median"] if old["median"] > 0 else float("inf")
+        if ratio > 1 + threshold:
+            status = "regression"
+        elif ratio < 1 - threshold:
+            status = "improvement"
+        else:
+            status = "ok"
+        rows.append(
+            {
+                "name": r["name"],
+                "status": status,
+                "median": r["median"],
+                "baseline": old["median"],
+                "ratio": ratio,
+            }
+        )
+    return rows
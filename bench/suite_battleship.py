@@ -0,0 +1,41 @@
+"""Battleship fleet counting: bitset DFS, profile DP and heatmap."""
+
+import battleship
+from bench.registry import benchmark
+
+FLEET = [3, 2, 2]
+
+
+@benchmark("battleship.dfs")
+def _dfs():
+    return lambda: battleship.count_fleet_configurations(6, 6, FLEET)
+
+
+@benchmark("battleship.dfs_no_touch_symmetry")
+def _dfs_symmetry():
+    return lambda: battleship.count_fleet_configurations(
+        6, 6, FLEET, allow_touch=False, symmetry=True
+    )
+
+
+@benchmark("battleship.profile")
+def _profile():
+    return lambda: battleship.count_fleet_configurations_profile(6, 6, FLEET)
+
+
+@benchmark("battleship.heatmap")
+def _heatmap():
+    return lambda: battleship.fleet_heatmap(6, 6, FLEET)
+
+
+@benchmark("battleship.heatmap_shot")
+def _heatmap_shot():
+    hm = battleship.FleetHeatmap(6, 6, FLEET)
+    hm.compute()
+
+    # the same miss every call: each call pays one shot's invalidation + recompute
+    def shot():
+        hm.shoot(2, 3, False)
+        return hm.compute()
+
+    return shot
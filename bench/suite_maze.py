@@ -0,0 +1,75 @@
+"""Maze scoring (pentomino_maze_opt): neighbors, components, diameter, placements."""
+
+from itertools import cycle
+from random import Random
+
+import pentomino_maze_opt as maze
+from bench.registry import benchmark, cache_provider
+from polyominoes import ominoes_dict
+
+W, H = 10, 10
+
+cache_provider(
+    "maze", maze.clear_caches, maze.cache_stats, maze.warm_caches, maze.snapshot_caches
+)
+
+
+def _pentomino_placements(w: int = W, h: int = H):
+    shapes = maze.generate_free_polyominoes(5, ominoes_dict)
+    return shapes, maze.build_global_placements(shapes, w, h)
+
+
+def _random_masks(k: int, seed: int = 1) -> list[int]:
+    """Occupancy masks of random feasible pentomino selections (as in the search)."""
+    _, placements = _pentomino_placements()
+    rng = Random(seed)
+    return [
+        maze.random_feasible_selection(placements, 12, True, rng)[1] for _ in range(k)
+    ]
+
+
+@benchmark("maze.build_neighbors")
+def _build_neighbors():
+    return lambda: maze.build_neighbors(W, H)
+
+
+@benchmark("maze.solve_component", setup_each=lambda: maze.clear_caches(["component"]))
+def _solve_component():
+    # component cache emptied before every call: each component goes through
+    # the workspace (all-pairs / block-cut / sweeps + path)
+    masks = cycle(_random_masks(64))
+    return lambda: maze._compute_diameter_and_path_uncached(next(masks), W, H)
+
+
+@benchmark("maze.diameter_uncached")
+def _diameter_uncached():
+    masks = cycle(_random_masks(64))
+    return lambda: maze._compute_diameter_and_path_uncached(next(masks), W, H)
+
+
+@benchmark("maze.diameter_cached")
+def _diameter_cached():
+    masks = _random_masks(64)
+    for m in masks:
+        maze.compute_diameter_and_path(m, W, H)
+    it = cycle(masks)
+    return lambda: maze.compute_diameter_and_path(next(it), W, H)
+
+
+@benchmark("maze.diameter_cold", setup_each=maze.clear_caches)
+def _diameter_cold():
+    # every call starts from empty caches (LRU, neighbors, palette)
+    masks = cycle(_random_masks(64))
+    return lambda: maze.compute_diameter_and_path(next(masks), W, H)
+
+
+@benchmark("maze.placements")
+def _placements():
+    shapes = maze.generate_free_polyominoes(5, ominoes_dict)
+    return lambda: maze.build_global_placements(shapes, W, H)
+
+
+@benchmark("maze.polyomino_enum")
+def _polyomino_enum():
+    # no lookup table: exercises the incremental-frontier search
+    return lambda: maze.generate_free_polyominoes(6, None)
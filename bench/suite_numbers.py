@@ -0,0 +1,59 @@
+"""Number theory: sieves, primality and perfect numbers."""
+
+from random import Random
+
+import perfect_nums
+import primality
+import sieve
+from bench.registry import benchmark
+
+
+@benchmark("sieve.iter_primes_1e6")
+def _iter_primes():
+    return lambda: sum(1 for _ in sieve.iter_primes(10**6))
+
+
+@benchmark("sieve.primes_array_1e6")
+def _primes_array():
+    return lambda: sieve.primes_array(10**6)
+
+
+@benchmark("sieve.count_primes_window_1e12")
+def _count_primes():
+    return lambda: sieve.count_primes(10**12, 10**12 + 10**6, workers=1)
+
+
+@benchmark("primality.is_prime_64bit")
+def _is_prime():
+    rng = Random(1)
+    values = [rng.getrandbits(64) | 1 for _ in range(1000)]
+    return lambda: [primality.is_prime(v) for v in values]
+
+
+@benchmark("primality.is_prime_many_32bit")
+def _is_prime_many():
+    rng = Random(1)
+    values = [rng.getrandbits(32) | 1 for _ in range(100_000)]
+    return lambda: primality.is_prime_many(values)
+
+
+@benchmark("perfect.lucas_lehmer_2203")
+def _lucas_lehmer():
+    return lambda: perfect_nums.lucas_lehmer(2203)
+
+
+@benchmark("perfect.is_perfectv6_range")
+def _is_perfectv6():
+    return lambda: [perfect_nums.is_perfectv6(n) for n in range(1, 20_001)]
+
+
+@benchmark("perfect.sigma_random_20_digits")
+def _sigma():
+    rng = Random(1)
+    values = [rng.randrange(10**19, 10**20) for _ in range(20)]
+    return lambda: [perfect_nums.sigma(v) for v in values]
+
+
+@benchmark("perfect.sigma_table_1e6")
+def _sigma_table():
+    return lambda: perfect_nums.sigma_table(10**6)
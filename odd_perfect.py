@@ -0,0 +1,67 @@
+"""
+Odd-perfect-number pre-filter cascade.
+
+No odd perfect number is known, but published results say a lot about what
+one would have to look like. The constraints are kept as data in
+`ODD_PERFECT_RULES` and compiled once: the lower bound becomes a single
+comparison and every congruence rule is merged into one residue table over
+the lcm of the moduli, so a candidate costs one big-int division.
+"""
+
+from math import isqrt, lcm
+
+# (kind, argument, reference)
+# - "bound": an odd perfect number is larger than the argument
+# - "congruence": (modulus, allowed residues); all rules must hold
+# - "euler_form": n = q^a * m^2 with q ≡ a ≡ 1 (mod 4), so n is not a square
+ODD_PERFECT_RULES = (
+    ("bound", 10**1500, "Ochem & Rao (2012)"),
+    ("congruence", (4, (1,)), "Euler: n = q^a m^2, q ≡ a ≡ 1 (mod 4)"),
+    ("congruence", (36, (1, 9, 13, 25)), "Touchard: n ≡ 1 (mod 12) or 9 (mod 36)"),
+    ("congruence", (105, tuple(range(1, 105))), "Sylvester: 105 does not divide n"),
+    ("euler_form", None, "Euler: exactly one prime to an odd power"),
+)
+
+
+def compile_rules(rules=ODD_PERFECT_RULES) -> tuple[int, int, bytearray, bool]:
+    """Compile a rule table into (bound, modulus, allowed, check_square).
+
+    - `allowed[n % modulus]` is 1 iff n passes every congruence rule
+    - Time Complexity: O(lcm(moduli) * rules), once
+    """
+    bound = 0
+    congruences = []
+    check_square = False
+    for kind, arg, _ in rules:
+        if kind == "bound":
+            bound = max(bound, arg)
+        elif kind == "congruence":
+            modulus, residues = arg
+            congruences.append((modulus, frozenset(residues)))
+        elif kind == "euler_form":
+            check_square = True
+        else:
+            raise ValueError(f"unknown rule kind: {kind!r}")
+    modulus = lcm(*(m for m, _ in congruences)) if congruences else 1
+    allowed = bytearray(
+        all(r % m in res for m, res in congruences) for r in range(modulus)
+    )
+    return bound, modulus, allowed, check_square
+
+
+_BOUND, _MODULUS, _ALLOWED, _CHECK_SQUARE = compile_rules()
+
+
+def odd_perfect_possible(n: int) -> bool:
+    """Return False if `n` provably is not an odd perfect number.
+
+    True only means no rule rejects n. The cascade runs from cheapest to
+    most expensive: bound comparison, one residue lookup, square test.
+    """
+    if n <= _BOUND or not _ALLOWED[n % _MODULUS]:
+        return False
+    if _CHECK_SQUARE:
+        r = isqrt(n)
+        if r * r == n:
+            return False
+    return True
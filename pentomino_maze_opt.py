@@ -1,9 +1,13 @@
+import json
+import sqlite3
+import sys
 from argparse import ArgumentParser
-from collections import deque
+from array import array
 from colorsys import hsv_to_rgb
-from functools import lru_cache
+from contextlib import contextmanager
+from functools import lru_cache, wraps
 from io import BytesIO
-from os import makedirs, path
+from os import makedirs, path, replace
 from random import Random, random
 from time import perf_counter
 from traceback import print_exc
@@ -12,6 +16,7 @@ from typing import Any, Dict, List, Optional, Set, Tuple
 from PIL import Image, ImageDraw
 
 from polyominoes import ominoes_dict
+from profiling import add_profile_arguments, profile_call
 
 # ---------------------- constantes ----------------------
 _ROTATIONS = (
@@ -231,57 +236,374 @@ def build_neighbors(w: int, h: int) -> List[List[int]]:
     return nb
 
 
-def bfs_local(
-    start_local: int, local_nb: List[List[int]]
-) -> Tuple[List[int], List[int]]:
+# até aqui o diâmetro é exato (BFS bit-paralelo de todas as fontes); com
+# a árvore de blocos, vale para o maior bloco biconexo do componente
+EXACT_THRESHOLD = 256
+# componentes menores vão direto para o BFS bit-paralelo (sem blocos)
+BLOCK_CUT_MIN_NODES = 32
+
+# tamanho do LRU (ajustável)
+_LRU_CACHE_SIZE = 10**15
+
+# neighbor cache global (usado por compute)
+_neighbors_cache = {}
+
+# [acertos, faltas] dos caches em dict (os LRU usam cache_info)
+_cache_counts = {"neighbors": [0, 0], "palette": [0, 0]}
+
+
+# cache de componentes: (w, máscara do componente transladada para a origem)
+# -> (diâmetro, a, b, caminho) em índices relativos ao deslocamento. Serve a
+# qualquer tabuleiro de mesma largura, mesmo quando o LRU do tabuleiro falha.
+_COMPONENT_CACHE_SIZE = 1 << 18
+_component_cache: Dict[Tuple[int, int], Tuple[int, int, int, Tuple[int, ...]]] = {}
+_cache_counts["component"] = [0, 0]
+
+
+def _biconnected_blocks(ladj: List[List[int]]) -> List[Tuple[int, list]]:
     """
-    BFS rápido em grafo pequeno representado por local_nb (lista de listas).
-    Retorna (dist, parent) onde ambos são listas de tamanho n_local.
+    Blocos biconexos (Hopcroft–Tarjan iterativo, DFS a partir do nó 0) do
+    grafo conexo ladj. Cada bloco é (cabeça, arestas): a cabeça é o vértice
+    de articulação pelo qual a DFS entrou no bloco (o nó 0 para os blocos da
+    raiz). Saem em pós-ordem: todo bloco pendurado num vértice do bloco B
+    (exceto a cabeça de B) sai antes de B.
     """
-    n = len(local_nb)
-    dist = [-1] * n
-    parent = [-1] * n
-    dq = deque()
-    dq.append(start_local)
-    dist[start_local] = 0
-
-    pop = dq.popleft
-    push = dq.append
-
-    while dq:
-        u = pop()
-        du = dist[u] + 1
-        for v in local_nb[u]:
-            if dist[v] == -1:
-                dist[v] = du
-                parent[v] = u
-                push(v)
-    return dist, parent
-
-
-# ====== Reconstruir caminho em índices locais e mapear para globais ======
-def reconstruct_path_local(
-    parent_local: List[int], src_local: int, dest_local: int, local_to_global: List[int]
-) -> List[int]:
-    path_local = []
-    cur = dest_local
-    while cur != -1:
-        path_local.append(cur)
-        if cur == src_local:
+    n = len(ladj)
+    disc = [-1] * n
+    low = [0] * n
+    disc[0] = 0
+    t = 1
+    stack = [[0, -1, 0]]  # [nó, pai, próximo vizinho]
+    edges = []
+    blocks = []
+    while stack:
+        top = stack[-1]
+        u, parent, i = top
+        nbrs = ladj[u]
+        if i < len(nbrs):
+            top[2] = i + 1
+            v = nbrs[i]
+            if disc[v] == -1:
+                disc[v] = low[v] = t
+                t += 1
+                edges.append((u, v))
+                stack.append([v, u, 0])
+            elif v != parent and disc[v] < disc[u]:
+                # aresta de retorno
+                if disc[v] < low[u]:
+                    low[u] = disc[v]
+                edges.append((u, v))
+            continue
+        stack.pop()
+        if not stack:
             break
-        cur = parent_local[cur]
-    path_local.reverse()
-    # map to global indices
-    return [local_to_global[i] for i in path_local]
+        pu = stack[-1][0]
+        if low[u] < low[pu]:
+            low[pu] = low[u]
+        if low[u] >= disc[pu]:
+            # pu separa a subárvore de u: as arestas desde (pu, u) formam um bloco
+            k = len(edges) - 1
+            while edges[k] != (pu, u):
+                k -= 1
+            blocks.append((pu, edges[k:]))
+            del edges[k:]
+    return blocks
+
+
+class ScoringWorkspace:
+    """
+    Buffers reutilizáveis para pontuar tabuleiros w x h. Marcas por época
+    substituem a limpeza:
+    - free[v] == board: v está vazia no tabuleiro atual
+    - comp[v] == ce: v pertence ao componente atual
+    - seen[v] == ep: v já foi visitada pelo BFS atual
+    pos[v] é a posição de v na ordem de inundação do seu componente.
+    """
+
+    __slots__ = (
+        "w", "h", "total", "nb", "free", "comp", "seen", "pos", "parent",
+        "queue", "board", "ce", "ep",
+    )  # fmt: skip
+
+    def __init__(self, w: int, h: int, nb: List[List[int]]):
+        total = w * h
+        self.w = w
+        self.h = h
+        self.total = total
+        self.nb = tuple(tuple(x) for x in nb)
+        self.free = [0] * total
+        self.comp = [0] * total
+        self.seen = [0] * total
+        self.pos = [0] * total  # posição na ordem de inundação
+        self.parent = [0] * total
+        self.queue = [0] * total
+        self.board = 0
+        self.ce = 0
+        self.ep = 0
+
+    def local_adjacency(self, comp_nodes: List[int]) -> List[List[int]]:
+        """Adjacência do componente em índices locais (posição na inundação)."""
+        nb = self.nb
+        free = self.free
+        board = self.board
+        pos = self.pos
+        return [[pos[v] for v in nb[u] if free[v] == board] for u in comp_nodes]
+
+    def all_pairs(
+        self, comp_nodes: List[int], ladj: List[List[int]]
+    ) -> Tuple[int, int, int]:
+        """
+        Diâmetro exato por BFS bit-paralelo: o bit i de reach[v] diz que a
+        fonte comp_nodes[i] já alcançou v. A cada passo todas as fontes
+        avançam juntas (front[v] = fontes que chegaram a v neste passo), e
+        o diâmetro é o último passo em que alguma chegou a algum nó. São
+        O(diâmetro * arestas) operações em inteiros de len(comp_nodes) bits.
+        Desempate igual ao BFS por fonte: a menor fonte com excentricidade
+        máxima e o primeiro nó (ordem de inundação) à distância máxima dela.
+        """
+        n = len(comp_nodes)
+        reach = [1 << i for i in range(n)]
+        front = reach[:]
+        d = 0
+        last = 0
+        while True:
+            nxt = [0] * n
+            arrived = 0
+            for v in range(n):
+                acc = 0
+                for u in ladj[v]:
+                    acc |= front[u]
+                if acc:
+                    acc &= ~reach[v]
+                    if acc:
+                        reach[v] |= acc
+                        nxt[v] = acc
+                        arrived |= acc
+            if not arrived:
+                break
+            d += 1
+            front = nxt
+            last = arrived
+        if not last:
+            return 0, comp_nodes[0], comp_nodes[0]
+        src = (last & -last).bit_length() - 1
+        bit = 1 << src
+        far = 0
+        while not front[far] & bit:
+            far += 1
+        return d, comp_nodes[src], comp_nodes[far]
+
+    def block_cut(
+        self, comp_nodes: List[int], blocks: List[Tuple[int, list]]
+    ) -> Tuple[int, int, int]:
+        """
+        Diâmetro exato pela árvore de blocos (blocks de _biconnected_blocks).
+        Em pós-ordem, cada bloco B de cabeça c conhece, para cada vértice x
+        seu, depth[x]: o ramo mais longo pendurado em x (blocos filhos já
+        resolvidos). Dentro de B um BFS bit-paralelo dá as distâncias d(x, y)
+        e com elas:
+        - candidatos a diâmetro depth[x] + d(x, y) + depth[y] (x != y, c
+          conta como ramo vazio, seus outros ramos entram na combinação)
+        - o ramo de B visto de c, max d(c, y) + depth[y], que combina com o
+          melhor ramo de c até aqui e depois o atualiza
+        Pontes (bloco de uma aresta, o caso dos corredores) são O(1); o
+        custo total é a soma de diâmetro * arestas de cada bloco.
+        """
+        n = len(comp_nodes)
+        depth = [0] * n
+        end = list(range(n))  # nó no fim do ramo depth[x]
+        best = 0
+        best_a = best_b = 0
+        for head, edges in blocks:
+            if len(edges) == 1:
+                x = edges[0][1]
+                branch = depth[x] + 1
+                branch_end = end[x]
+            else:
+                # bit i = i-ésimo vértice em ordem decrescente de depth, então
+                # o menor bit de um conjunto de fontes é a de ramo mais longo
+                verts = sorted({a for e in edges for a in e}, key=depth.__getitem__)
+                verts.reverse()
+                idx = {v: i for i, v in enumerate(verts)}
+                m = len(verts)
+                badj = [[] for _ in range(m)]
+                for a, b in edges:
+                    badj[idx[a]].append(idx[b])
+                    badj[idx[b]].append(idx[a])
+                bdepth = [depth[v] for v in verts]
+                bend = [end[v] for v in verts]
+                ih = idx[head]
+                bdepth[ih] = 0
+                bend[ih] = head
+                head_bit = 1 << ih
+                branch = 0
+                branch_end = head
+                reach = [1 << i for i in range(m)]
+                front = reach[:]
+                d = 0
+                while True:
+                    d += 1
+                    nxt = [0] * m
+                    arrived = 0
+                    for y in range(m):
+                        acc = 0
+                        for u in badj[y]:
+                            acc |= front[u]
+                        if acc:
+                            acc &= ~reach[y]
+                            if acc:
+                                reach[y] |= acc
+                                nxt[y] = acc
+                                arrived |= acc
+                                x = (acc & -acc).bit_length() - 1
+                                c = bdepth[x] + d + bdepth[y]
+                                if c > best:
+                                    best = c
+                                    best_a = bend[x]
+                                    best_b = bend[y]
+                                if acc & head_bit and d + bdepth[y] > branch:
+                                    branch = d + bdepth[y]
+                                    branch_end = bend[y]
+                    if not arrived:
+                        break
+                    front = nxt
+            c = depth[head] + branch
+            if c > best:
+                best = c
+                best_a = end[head]
+                best_b = branch_end
+            if branch > depth[head]:
+                depth[head] = branch
+                end[head] = branch_end
+        return best, comp_nodes[best_a], comp_nodes[best_b]
+
+    def sweep(self, src: int) -> Tuple[int, int, int]:
+        """
+        BFS por níveis a partir de src no componente vazio que o contém:
+        (excentricidade, início e fim do último nível na fila).
+        """
+        nb = self.nb
+        free = self.free
+        board = self.board
+        seen = self.seen
+        queue = self.queue
+        self.ep += 1
+        ep = self.ep
+        seen[src] = ep
+        queue[0] = src
+        head = 0
+        tail = 1
+        level_start = 0
+        level_end = 1
+        d = 0
+        while True:
+            while head < level_end:
+                for v in nb[queue[head]]:
+                    if free[v] == board and seen[v] != ep:
+                        seen[v] = ep
+                        queue[tail] = v
+                        tail += 1
+                head += 1
+            if tail == level_end:
+                return d, level_start, tail
+            d += 1
+            level_start = level_end
+            level_end = tail
+
+    def first_in_flood_order(self, lo: int, hi: int) -> int:
+        """Nó de queue[lo:hi] que veio primeiro na inundação (desempate)."""
+        pos = self.pos
+        queue = self.queue
+        best = queue[lo]
+        for k in range(lo + 1, hi):
+            v = queue[k]
+            if pos[v] < pos[best]:
+                best = v
+        return best
+
+    def path(self, src: int, dest: int) -> List[int]:
+        """Caminho mínimo src -> dest (BFS com pais, mesma ordem de vizinhos)."""
+        nb = self.nb
+        free = self.free
+        board = self.board
+        seen = self.seen
+        parent = self.parent
+        queue = self.queue
+        self.ep += 1
+        ep = self.ep
+        seen[src] = ep
+        queue[0] = src
+        head = 0
+        tail = 1
+        while head < tail:
+            u = queue[head]
+            head += 1
+            if u == dest:
+                break
+            for v in nb[u]:
+                if free[v] == board and seen[v] != ep:
+                    seen[v] = ep
+                    parent[v] = u
+                    queue[tail] = v
+                    tail += 1
+        out = [dest]
+        while dest != src:
+            dest = parent[dest]
+            out.append(dest)
+        out.reverse()
+        return out
 
 
-EXACT_THRESHOLD = 120
+_workspaces: Dict[Tuple[int, int], ScoringWorkspace] = {}
 
-# tamanho do LRU (ajustável)
-_LRU_CACHE_SIZE = 10**15
 
-# neighbor cache global (usado por compute)
-_neighbors_cache = {}
+def _workspace(w: int, h: int, nb: List[List[int]]) -> ScoringWorkspace:
+    ws = _workspaces.get((w, h))
+    if ws is None:
+        ws = _workspaces[(w, h)] = ScoringWorkspace(w, h, nb)
+    return ws
+
+
+def _solve_component(
+    ws: ScoringWorkspace, comp_nodes: List[int]
+) -> Tuple[int, int, int, List[int]]:
+    """
+    Diâmetro (em arestas), extremos e caminho de um componente, em índices
+    globais:
+    - pequenos: BFS bit-paralelo de todas as fontes (exato)
+    - com vértices de articulação (labirintos de corredores: o maior bloco
+      biconexo tem até 3/4 das arestas) ou grandes demais para o BFS de
+      todas as fontes: árvore de blocos, exata se o maior bloco cabe em
+      EXACT_THRESHOLD
+    - senão BFS bit-paralelo até EXACT_THRESHOLD células, e acima disso a
+      heurística de BFS dupla
+    """
+    n = len(comp_nodes)
+    ladj = ws.local_adjacency(comp_nodes)
+    use_blocks = False
+    if n > BLOCK_CUT_MIN_NODES:
+        blocks = _biconnected_blocks(ladj)
+        total = 0
+        largest = 0
+        for _, edges in blocks:
+            total += len(edges)
+            if len(edges) > largest:
+                largest = len(edges)
+        # um bloco de k arestas tem no máximo k vértices
+        use_blocks = largest <= EXACT_THRESHOLD and (
+            n > EXACT_THRESHOLD or 4 * largest <= 3 * total
+        )
+    if use_blocks:
+        best_d, best_src, best_far = ws.block_cut(comp_nodes, blocks)
+    elif n <= EXACT_THRESHOLD:
+        best_d, best_src, best_far = ws.all_pairs(comp_nodes, ladj)
+    else:
+        # heuristica dupla
+        _, lo, hi = ws.sweep(comp_nodes[0])
+        best_src = ws.first_in_flood_order(lo, hi)
+        best_d, lo, hi = ws.sweep(best_src)
+        best_far = ws.first_in_flood_order(lo, hi)
+    return best_d, best_src, best_far, ws.path(best_src, best_far)
 
 
 # função não-cacheada (mantém a mesma lógica, mas usa _neighbors_cache)
@@ -299,105 +621,100 @@ def _compute_diameter_and_path_uncached(
     # cache neighbors via global
     neighbors = _neighbors_cache.get((w, h))
     if neighbors is None:
+        _cache_counts["neighbors"][1] += 1
         neighbors = build_neighbors(w, h)
         _neighbors_cache[(w, h)] = neighbors
-    nb = neighbors
+    else:
+        _cache_counts["neighbors"][0] += 1
+    ws = _workspace(w, h, neighbors)
+    nb = ws.nb
+    free = ws.free
+    comp = ws.comp
+    pos = ws.pos
+    queue = ws.queue
+    comp_cache = _component_cache
+    comp_counts = _cache_counts["component"]
+
+    # marca as células vazias deste tabuleiro (bit i da string = célula i)
+    ws.board += 1
+    board = ws.board
+    bits = format(empty_mask, "b")[::-1]
+    empties = []
+    i = bits.find("1")
+    while i != -1:
+        free[i] = board
+        empties.append(i)
+        i = bits.find("1", i + 1)
 
-    remaining = empty_mask
     best_diam = 0
     best_a = None
     best_b = None
     best_path = []
+    first_ce = ws.ce + 1
 
-    while remaining:
-        lsb = remaining & -remaining
-        start = lsb.bit_length() - 1
-
-        # flood fill component (global indices)
-        comp_nodes = []
-        q = [start]
-        seen = [False] * total
-        seen[start] = True
-        qi = 0
-        while qi < len(q):
-            u = q[qi]
-            qi += 1
-            comp_nodes.append(u)
+    for start in empties:
+        # já inundada por um componente deste tabuleiro
+        if comp[start] >= first_ce:
+            continue
+        ws.ce += 1
+        ce = ws.ce
+
+        # flood fill component (global indices), na fila do workspace
+        comp[start] = ce
+        pos[start] = 0
+        queue[0] = start
+        head = 0
+        tail = 1
+        while head < tail:
+            u = queue[head]
+            head += 1
             for v in nb[u]:
-                if (not seen[v]) and (((empty_mask >> v) & 1) != 0):
-                    seen[v] = True
-                    q.append(v)
+                if free[v] == board and comp[v] != ce:
+                    comp[v] = ce
+                    pos[v] = tail
+                    queue[tail] = v
+                    tail += 1
+        if tail < 2:
+            continue
+        comp_nodes = list(queue[:tail])
 
-        # remove comp from remaining
+        # máscara e coluna mínima, para a translação
         comp_mask = 0
+        minx = w
         for u in comp_nodes:
             comp_mask |= 1 << u
-        remaining &= ~comp_mask
-
-        comp_size = len(comp_nodes)
-        if comp_size < 2:
-            continue
-
-        # build mapping global->local
-        map_global_to_local = [-1] * total
-        for i, g in enumerate(comp_nodes):
-            map_global_to_local[g] = i
-        local_to_global = comp_nodes[:]  # index -> global index
-
-        # build local adjacency
-        local_nb = [[] for _ in range(comp_size)]
-        for i, g in enumerate(comp_nodes):
-            for gg in nb[g]:
-                gg_local = map_global_to_local[gg]
-                if gg_local != -1:
-                    local_nb[i].append(gg_local)
-
-        if comp_size <= EXACT_THRESHOLD:
-            # exact all-pairs BFS in grafo local
-            for src_local in range(comp_size):
-                dist, parent = bfs_local(src_local, local_nb)
-                far_local = src_local
-                far_d = 0
-                for v_local in range(comp_size):
-                    d = dist[v_local]
-                    if d > far_d:
-                        far_d = d
-                        far_local = v_local
-                if far_d > best_diam:
-                    best_diam = far_d
-                    best_a = local_to_global[src_local]
-                    best_b = local_to_global[far_local]
-                    best_path = reconstruct_path_local(
-                        parent, src_local, far_local, local_to_global
-                    )
+            x = u % w
+            if x < minx:
+                minx = x
+
+        # fingerprint: start é a menor célula, logo está na linha mínima
+        shift = (start // w) * w + minx
+        key = (w, comp_mask >> shift)
+        hit = comp_cache.get(key)
+        if hit is None:
+            comp_counts[1] += 1
+            d, a, b, comp_path = _solve_component(ws, comp_nodes)
+            if len(comp_cache) >= _COMPONENT_CACHE_SIZE:
+                comp_cache.clear()
+            comp_cache[key] = (
+                d,
+                a - shift,
+                b - shift,
+                tuple(g - shift for g in comp_path),
+            )
+            if d > best_diam:
+                best_diam = d
+                best_a = a
+                best_b = b
+                best_path = comp_path
         else:
-            # heuristica dupla
-            a_local = 0
-            dist_a, parent_a = bfs_local(a_local, local_nb)
-            far_a_local = a_local
-            max_da = 0
-            for v_local in range(comp_size):
-                d = dist_a[v_local]
-                if d > max_da:
-                    max_da = d
-                    far_a_local = v_local
-
-            dist_b, parent_b = bfs_local(far_a_local, local_nb)
-            far_b_local = far_a_local
-            max_db = 0
-            for v_local in range(comp_size):
-                d = dist_b[v_local]
-                if d > max_db:
-                    max_db = d
-                    far_b_local = v_local
-
-            if max_db > best_diam:
-                best_diam = max_db
-                best_a = local_to_global[far_a_local]
-                best_b = local_to_global[far_b_local]
-                best_path = reconstruct_path_local(
-                    parent_b, far_a_local, far_b_local, local_to_global
-                )
+            comp_counts[0] += 1
+            d = hit[0]
+            if d > best_diam:
+                best_diam = d
+                best_a = hit[1] + shift
+                best_b = hit[2] + shift
+                best_path = [g + shift for g in hit[3]]
 
     # Return como tupla imutável para cache (path como tuple)
     return (
@@ -408,9 +725,159 @@ def _compute_diameter_and_path_uncached(
     )
 
 
+def _tracked_lru(fn, warm: Dict[tuple, Any], results: Dict[tuple, Any], maxsize):
+    """
+    lru_cache sobre fn que guarda também em `results` o resultado de cada
+    falta (o lru_cache não expõe seu conteúdo; snapshot_caches lê daqui sem
+    consultar o LRU, que contaria acertos e mudaria a ordem de despejo).
+    `results` tem o mesmo limite do LRU e despeja a entrada mais antiga.
+    Antes de calcular, consome resultados pré-carregados em `warm` por
+    warm_caches. Nada muda no caminho de acerto.
+    """
+
+    def miss(*key):
+        res = warm.pop(key, None)
+        if res is None:
+            res = fn(*key)
+        results[key] = res
+        if len(results) > maxsize:
+            del results[next(iter(results))]
+        return res
+
+    return lru_cache(maxsize=maxsize)(miss)
+
+
+# ---------------------- banco de scores persistente (opcional) ----------------------
+# versão do cálculo de _compute_diameter_and_path_uncached; suba sempre que
+# o resultado mudar (diâmetro, extremos ou caminho) para não ler scores velhos
+SCORER_VERSION = 3
+
+
+class ScoreStore:
+    """
+    Scores em disco (sqlite), compartilhados entre execuções e processos.
+    Chave: (w, h, bytes da máscara) — a própria máscara, sem colisão; o
+    índice da tabela faz o papel do hash. Cada versão do cálculo tem a sua
+    tabela (scores_v{SCORER_VERSION}), então um banco antigo nunca devolve
+    score de outra versão. Escritas ficam num buffer e vão
+    para o banco em lotes (batch_size entradas ou flush_interval segundos);
+    o modo WAL deixa vários workers lendo e gravando o mesmo arquivo.
+    """
+
+    def __init__(self, file: str, batch_size: int = 512, flush_interval: float = 2.0):
+        self.file = file
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.table = f"scores_v{SCORER_VERSION}"
+        self.conn = sqlite3.connect(file, timeout=60)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.table} ("
+            " w INTEGER NOT NULL, h INTEGER NOT NULL, mask BLOB NOT NULL,"
+            " nodes INTEGER NOT NULL, a INTEGER, b INTEGER, path BLOB NOT NULL,"
+            " PRIMARY KEY (w, h, mask)) WITHOUT ROWID"
+        )
+        self.conn.commit()
+        self.pending: Dict[Tuple[int, int, bytes], tuple] = {}
+        self.last_flush = perf_counter()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(block_mask: int, w: int, h: int) -> Tuple[int, int, bytes]:
+        nbytes = (max(w * h, block_mask.bit_length()) + 7) // 8
+        return w, h, block_mask.to_bytes(nbytes, "little")
+
+    def get(self, block_mask: int, w: int, h: int):
+        key = self._key(block_mask, w, h)
+        row = self.pending.get(key)
+        if row is None:
+            row = self.conn.execute(
+                f"SELECT nodes, a, b, path FROM {self.table}"
+                " WHERE w=? AND h=? AND mask=?",
+                key,
+            ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        nodes, a, b, path_b = row
+        return nodes, a, b, tuple(array("i", path_b))
+
+    def put(self, block_mask: int, w: int, h: int, result) -> None:
+        nodes, a, b, path_t = result
+        key = self._key(block_mask, w, h)
+        self.pending[key] = (nodes, a, b, array("i", path_t).tobytes())
+        if (
+            len(self.pending) >= self.batch_size
+            or perf_counter() - self.last_flush >= self.flush_interval
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        if self.pending:
+            self.conn.executemany(
+                f"INSERT OR IGNORE INTO {self.table} VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [key + row for key, row in self.pending.items()],
+            )
+            self.conn.commit()
+            self.pending.clear()
+        self.last_flush = perf_counter()
+
+    def __len__(self) -> int:
+        count = self.conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        return count + len(self.pending)
+
+    def close(self) -> None:
+        self.flush()
+        self.conn.close()
+
+
+_score_store: Optional[ScoreStore] = None
+
+
+def open_score_store(file: str, batch_size: int = 512) -> ScoreStore:
+    """Liga o banco de scores: faltas do LRU passam a consultá-lo antes de calcular."""
+    global _score_store
+    close_score_store()
+    _score_store = ScoreStore(file, batch_size)
+    return _score_store
+
+
+def close_score_store() -> None:
+    """Grava o lote pendente e desliga o banco (sem efeito se já desligado)."""
+    global _score_store
+    if _score_store is not None:
+        _score_store.close()
+        _score_store = None
+
+
+# cálculo usado nas faltas do LRU; a instrumentação troca por uma versão
+# cronometrada sem trocar o LRU (conteúdo e chaves continuam os mesmos)
+_score_uncached = _compute_diameter_and_path_uncached
+
+
+def _stored_or_computed(block_mask: int, w: int, h: int):
+    """Função de falta do LRU: banco de scores (se ligado), senão _score_uncached."""
+    store = _score_store
+    if store is None:
+        return _score_uncached(block_mask, w, h)
+    res = store.get(block_mask, w, h)
+    if res is None:
+        res = _score_uncached(block_mask, w, h)
+        store.put(block_mask, w, h, res)
+    return res
+
+
+# resultados carregados de arquivo, consumidos na primeira falta do LRU
+_compute_warm: Dict[Tuple[int, int, int], tuple] = {}
+# resultado das últimas faltas do LRU, por (block_mask, w, h)
+_compute_results: Dict[Tuple[int, int, int], tuple] = {}
+
 # wrapper cacheado (LRU) — o cache armazenará as tuplas retornadas acima
-_cached_compute = lru_cache(maxsize=_LRU_CACHE_SIZE)(
-    _compute_diameter_and_path_uncached
+_cached_compute = _tracked_lru(
+    _stored_or_computed, _compute_warm, _compute_results, _LRU_CACHE_SIZE
 )
 
 
@@ -548,7 +1015,9 @@ _palette_cache = {}
 
 def get_palette(num_shapes: int) -> List[Tuple[int, int, int]]:
     if num_shapes in _palette_cache:
+        _cache_counts["palette"][0] += 1
         return _palette_cache[num_shapes]
+    _cache_counts["palette"][1] += 1
     # trunk-ignore(bandit/B311)
     rng = Random(12345)
     palette = []
@@ -680,6 +1149,363 @@ def render_maze_and_path_by_shape(
             raise
 
 
+# ---------------------- registro de caches ----------------------
+class _CacheEntry:
+    """
+    Controles de um cache: tamanho, (acertos, faltas), limpar, dump/load JSON.
+    scored: o conteúdo sai do cálculo de scores (vale só para SCORER_VERSION).
+    """
+
+    __slots__ = ("name", "size", "counts", "clear", "dump", "load", "scored")
+
+    def __init__(self, name, size, counts, clear, dump, load, scored):
+        self.name = name
+        self.size = size
+        self.counts = counts
+        self.clear = clear
+        self.dump = dump
+        self.load = load
+        self.scored = scored
+
+
+_CACHES: Dict[str, _CacheEntry] = {}
+
+
+def register_cache(
+    name: str, size, counts, clear, dump=None, load=None, scored=False
+) -> None:
+    """
+    Registra um cache. size() -> int, counts() -> (acertos, faltas),
+    clear() -> None, dump() -> dado JSON, load(dado) -> nº de entradas.
+    scored=True: guarda resultados do cálculo de scores; warm_caches o pula
+    se o snapshot é de outra SCORER_VERSION.
+    """
+    _CACHES[name] = _CacheEntry(name, size, counts, clear, dump, load, scored)
+
+
+def _select_caches(names) -> List[_CacheEntry]:
+    if names is None:
+        return list(_CACHES.values())
+    unknown = set(names) - set(_CACHES)
+    if unknown:
+        raise KeyError(f"unknown caches: {sorted(unknown)}")
+    return [_CACHES[n] for n in names]
+
+
+def cache_stats(names=None) -> List[Dict[str, Any]]:
+    """Uma linha por cache: nome, tamanho, acertos, faltas e taxa de acerto."""
+    rows = []
+    for entry in _select_caches(names):
+        hits, misses = entry.counts()
+        lookups = hits + misses
+        rows.append(
+            {
+                "name": entry.name,
+                "size": entry.size(),
+                "hits": hits,
+                "misses": misses,
+                "hit_ratio": hits / lookups if lookups else 0.0,
+            }
+        )
+    return rows
+
+
+def clear_caches(names=None) -> None:
+    """Esvazia os caches (todos, por padrão) e zera seus contadores."""
+    for entry in _select_caches(names):
+        entry.clear()
+
+
+def snapshot_caches(file: str, names=None) -> None:
+    """Grava o conteúdo dos caches em JSON (escrita atômica)."""
+    data = {
+        "version": SCORER_VERSION,
+        "caches": {
+            e.name: e.dump() for e in _select_caches(names) if e.dump is not None
+        },
+    }
+    tmp = file + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+    replace(tmp, file)
+
+
+def warm_caches(file: str, names=None) -> int:
+    """
+    Carrega um snapshot de snapshot_caches; devolve o nº de entradas lidas.
+    Snapshot de outra SCORER_VERSION: os caches de scores ficam de fora.
+    """
+    with open(file, "r") as f:
+        data = json.load(f)
+    stored = data.get("caches", {})
+    stale = data.get("version") != SCORER_VERSION
+    loaded = 0
+    for entry in _select_caches(names):
+        if entry.scored and stale:
+            continue
+        if entry.load is not None and entry.name in stored:
+            loaded += entry.load(stored[entry.name])
+    return loaded
+
+
+def _compute_info():
+    return _cached_compute.cache_info()
+
+
+def _clear_compute() -> None:
+    _cached_compute.cache_clear()
+    _compute_results.clear()
+    _compute_warm.clear()
+
+
+def _dump_compute() -> List[list]:
+    return [
+        [*key, nodes, a, b, list(path_t)]
+        for key, (nodes, a, b, path_t) in _compute_results.items()
+    ]
+
+
+def _load_compute(items) -> int:
+    for mask, w, h, nodes, a, b, path_l in items:
+        _compute_warm[(mask, w, h)] = (nodes, a, b, tuple(path_l))
+    # passa cada chave pelo LRU: a falta consome o resultado pré-carregado
+    for mask, w, h, *_ in items:
+        _cached_compute(mask, w, h)
+    return len(items)
+
+
+def _clear_dict(cache: dict, counter: str):
+    def clear() -> None:
+        cache.clear()
+        _cache_counts[counter][:] = [0, 0]
+
+    return clear
+
+
+def _load_neighbors(items) -> int:
+    for w, h, nb in items:
+        _neighbors_cache[(w, h)] = nb
+    return len(items)
+
+
+def _load_palette(items) -> int:
+    for n, palette in items:
+        _palette_cache[n] = [tuple(c) for c in palette]
+    return len(items)
+
+
+register_cache(
+    "compute",
+    lambda: _compute_info().currsize,
+    lambda: (_compute_info().hits, _compute_info().misses),
+    _clear_compute,
+    _dump_compute,
+    _load_compute,
+    scored=True,
+)
+register_cache(
+    "neighbors",
+    lambda: len(_neighbors_cache),
+    lambda: tuple(_cache_counts["neighbors"]),
+    _clear_dict(_neighbors_cache, "neighbors"),
+    lambda: [[w, h, nb] for (w, h), nb in _neighbors_cache.items()],
+    _load_neighbors,
+)
+register_cache(
+    "palette",
+    lambda: len(_palette_cache),
+    lambda: tuple(_cache_counts["palette"]),
+    _clear_dict(_palette_cache, "palette"),
+    lambda: [[n, pal] for n, pal in _palette_cache.items()],
+    _load_palette,
+)
+
+
+def _load_component(items) -> int:
+    for w, mask, d, a, b, path_l in items:
+        _component_cache[(w, mask)] = (d, a, b, tuple(path_l))
+    return len(items)
+
+
+register_cache(
+    "component",
+    lambda: len(_component_cache),
+    lambda: tuple(_cache_counts["component"]),
+    _clear_dict(_component_cache, "component"),
+    lambda: [[w, m, *v[:3], list(v[3])] for (w, m), v in _component_cache.items()],
+    _load_component,
+    scored=True,
+)
+
+# canonicalização da bruteforce_search: o cache é local a cada chamada
+# (depende de w, h); o registro aponta para o da última chamada e o warm
+# fica guardado por (w, h) até a próxima busca com as mesmas dimensões
+_canonical_cache: Dict[str, Any] = {"wh": None, "fn": None, "keys": {}}
+_canonical_warm: Dict[Tuple[int, int], Dict[tuple, int]] = {}
+
+
+def _canonical_counts() -> Tuple[int, int]:
+    fn = _canonical_cache["fn"]
+    if fn is None:
+        return 0, 0
+    info = fn.cache_info()
+    return info.hits, info.misses
+
+
+def _clear_canonical() -> None:
+    fn = _canonical_cache["fn"]
+    if fn is not None:
+        fn.cache_clear()
+    _canonical_cache["keys"].clear()
+    _canonical_warm.clear()
+
+
+def _dump_canonical() -> Dict[str, Any] | None:
+    fn = _canonical_cache["fn"]
+    if fn is None:
+        return None
+    w, h = _canonical_cache["wh"]
+    items = [[mask, fn(mask)] for (mask,) in list(_canonical_cache["keys"])]
+    return {"w": w, "h": h, "items": items}
+
+
+def _load_canonical(payload) -> int:
+    if not payload:
+        return 0
+    warm = _canonical_warm.setdefault((payload["w"], payload["h"]), {})
+    for mask, canon in payload["items"]:
+        warm[(mask,)] = canon
+    return len(payload["items"])
+
+
+register_cache(
+    "canonical",
+    lambda: (
+        _canonical_cache["fn"].cache_info().currsize
+        if _canonical_cache["fn"] is not None
+        else 0
+    ),
+    _canonical_counts,
+    _clear_canonical,
+    _dump_canonical,
+    _load_canonical,
+)
+
+
+# ---------------------- instrumentação (opt-in) ----------------------
+class HotPathStats:
+    """
+    Contadores e tempos acumulados por fase do otimizador.
+    Só existe enquanto `instrumentation()` está ativa: desligada, as funções
+    originais ficam no lugar e o laço principal paga apenas um `is None`.
+    Os tempos são inclusivos: solve_component (diâmetro e caminho de um
+    componente, só nas faltas do cache de componentes) roda dentro de
+    compute_uncached.
+    """
+
+    PHASES = ("neighbor_move", "compute_uncached", "solve_component", "render")
+
+    def __init__(self, interval: float = 5.0, stream=None):
+        self.calls = dict.fromkeys(self.PHASES, 0)
+        self.seconds = dict.fromkeys(self.PHASES, 0.0)
+        self.interval = interval
+        self.stream = stream if stream is not None else sys.stderr
+        self.start = perf_counter()
+        self.next_emit = self.start + interval
+        self.steps = 0
+        self.accepted = 0
+        self.best_score = -1
+        self.cache = None  # lru_cache do compute (para a taxa de acerto)
+        self.cache_base = (0, 0)  # (acertos, faltas) dele ao ligar
+
+    def timed(self, phase: str, fn):
+        calls = self.calls
+        seconds = self.seconds
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            t0 = perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                seconds[phase] += perf_counter() - t0
+                calls[phase] += 1
+
+        return wrapper
+
+    def snapshot(self, kind: str = "progress") -> Dict[str, Any]:
+        elapsed = perf_counter() - self.start
+        hits = misses = 0
+        if self.cache is not None:
+            info = self.cache.cache_info()
+            hits = max(0, info.hits - self.cache_base[0])
+            misses = max(0, info.misses - self.cache_base[1])
+        lookups = hits + misses
+        return {
+            "kind": kind,
+            "elapsed": round(elapsed, 3),
+            "steps": self.steps,
+            "steps_per_s": round(self.steps / elapsed, 1) if elapsed > 0 else 0.0,
+            "accept_rate": round(self.accepted / self.steps, 4) if self.steps else 0.0,
+            "best_score": self.best_score,
+            "cache_hits": hits,
+            "cache_misses": misses,
+            "cache_hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "calls": dict(self.calls),
+            "seconds": {k: round(v, 4) for k, v in self.seconds.items()},
+        }
+
+    def emit(self, kind: str = "progress") -> None:
+        print(json.dumps(self.snapshot(kind)), file=self.stream, flush=True)
+
+    def tick(self, steps: int, accepted: int, best_score: int) -> None:
+        """Chamado a cada passo do annealing; emite uma linha JSON por intervalo."""
+        self.steps = steps
+        self.accepted = accepted
+        self.best_score = best_score
+        if perf_counter() >= self.next_emit:
+            self.emit()
+            self.next_emit = perf_counter() + self.interval
+
+
+_stats: Optional[HotPathStats] = None
+
+
+@contextmanager
+def instrumentation(interval: float = 5.0, stream=None):
+    """
+    Liga a instrumentação: troca neighbor_move, _solve_component,
+    render_maze_and_path_by_shape e o cálculo das faltas do LRU
+    (_score_uncached) por versões cronometradas. O LRU continua o mesmo, com
+    seu conteúdo; a taxa de acerto conta só as consultas feitas enquanto a
+    instrumentação está ligada. Ao sair, as funções originais são restauradas.
+    """
+    global _stats
+    if _stats is not None:
+        yield _stats
+        return
+    g = globals()
+    names = (
+        "neighbor_move",
+        "_score_uncached",
+        "_solve_component",
+        "render_maze_and_path_by_shape",
+    )
+    originals = {name: g[name] for name in names}
+    stats = HotPathStats(interval, stream)
+    for name, phase in zip(names, HotPathStats.PHASES, strict=True):
+        g[name] = stats.timed(phase, originals[name])
+    info = _cached_compute.cache_info()
+    stats.cache = _cached_compute
+    stats.cache_base = (info.hits, info.misses)
+    _stats = stats
+    try:
+        yield stats
+    finally:
+        g.update(originals)
+        _stats = None
+
+
 # ---------------------- heuristic optimizer (unchanged API, prints included) ----------------------
 def optimize_maze(
     placements: List[Dict[str, Any]],
@@ -694,7 +1520,26 @@ def optimize_maze(
     out: str = "best.png",
     cell: int = 30,
     first_greedy: int = 100,
+    instrument: bool = False,
+    stats_interval: float = 5.0,
 ) -> Tuple[int, List[int], int, List[int]]:
+    if instrument:
+        # mesma busca, com as fases cronometradas (ver `instrumentation`)
+        with instrumentation(stats_interval):
+            return optimize_maze(
+                placements,
+                w,
+                h,
+                max_pieces,
+                no_repeat,
+                time_limit,
+                seed,
+                init_selection,
+                init_placement,
+                out,
+                cell,
+                first_greedy,
+            )
     if time_limit is None:
         time_limit = float("inf")
     # trunk-ignore(bandit/B311)
@@ -794,6 +1639,8 @@ def optimize_maze(
     T0 = 1.0
     Tmin = 0.001
     step = 0
+    accepted = 0
+    stats = _stats
 
     while perf_counter() - start_time < time_limit:
         step += 1
@@ -819,6 +1666,7 @@ def optimize_maze(
                 accept = True
 
         if accept:
+            accepted += 1
             current_sel = sel2
             current_occ = occ2
             current_score = sc2
@@ -839,9 +1687,14 @@ def optimize_maze(
                 # trunk-ignore(bandit/B110)
                 except Exception:
                     pass
+        if stats is not None:
+            stats.tick(step, accepted, best_score)
     print(
         f"[done] elapsed={perf_counter()-start_time:.1f}s steps={step} best_score={best_score} pieces={0 if not best_sel else len(best_sel)}"
     )
+    if stats is not None:
+        stats.tick(step, accepted, best_score)
+        stats.emit("summary")
     return best_score, best_sel, best_occ, best_path
 
 
@@ -933,9 +1786,7 @@ def bruteforce_search(
     maps = [tuple(m) for m in maps]
 
     # ---------- caching canonicalization ----------
-    @lru_cache(maxsize=None)
-    def canonical_mask_cached(mask: int) -> int:
-        # same logic as canonical_mask but cached
+    def canonical_mask(mask: int) -> int:
         best = None
         for mapping in maps:
             m = mask
@@ -950,6 +1801,13 @@ def bruteforce_search(
                 best = res
         return best if best is not None else mask
 
+    # cached, visível no registro de caches como "canonical"
+    canonical_keys: Dict[tuple, None] = {}
+    canonical_mask_cached = _tracked_lru(
+        canonical_mask, _canonical_warm.pop((w, h), {}), canonical_keys, None
+    )
+    _canonical_cache.update(wh=(w, h), fn=canonical_mask_cached, keys=canonical_keys)
+
     # ---------- DFS with canonical-pruning and upper-bound pruning ----------
     nodes_visited = 0
     time_up = False
@@ -1058,9 +1916,57 @@ def main() -> None:
     p.add_argument("--init-pos", type=int, default=None)
     p.add_argument("--init-selection", type=str, default=None)
     # brute-force control
-    p.add_argument("--bruteforce", action="store_true", help="force exhaustive bruteforce")
+    p.add_argument(
+        "--bruteforce", action="store_true", help="force exhaustive bruteforce"
+    )
+    # instrumentação do otimizador heurístico (linhas JSON em stderr)
+    p.add_argument(
+        "--instrument", action="store_true", help="time hot paths, JSON lines on stderr"
+    )
+    p.add_argument("--stats-interval", type=float, default=5.0)
+    # estado dos caches entre execuções
+    p.add_argument(
+        "--cache-warm", type=str, default=None, help="load caches from a snapshot"
+    )
+    p.add_argument(
+        "--cache-snapshot", type=str, default=None, help="save caches at the end"
+    )
+    p.add_argument(
+        "--score-db",
+        type=str,
+        default=None,
+        help="sqlite score store shared across runs",
+    )
+    add_profile_arguments(p)
     args = p.parse_args()
+    if args.score_db:
+        open_score_store(args.score_db)
+    try:
+        if args.profile:
+            profile_call(
+                _run,
+                args,
+                mode=args.profile,
+                out=args.profile_out,
+                top=args.profile_top,
+            )
+        else:
+            _run(args)
+    finally:
+        if _score_store is not None:
+            store = _score_store
+            print(f"Score store {store.file}: hits={store.hits} misses={store.misses}")
+        close_score_store()
+
 
+def _run(args) -> None:
+    if args.cache_warm:
+        print(
+            "Warming caches from",
+            args.cache_warm,
+            "entries:",
+            warm_caches(args.cache_warm),
+        )
     no_repeat = True if not args.allow_repeat else False
 
     def parse_init_selection(s: Optional[str]) -> Optional[List[int]]:
@@ -1069,8 +1975,6 @@ def main() -> None:
         s = s.strip()
         if path.exists(s):
             try:
-                import json
-
                 j = json.load(open(s, "r"))
                 if isinstance(j, dict) and "selection" in j:
                     return list(map(int, j["selection"]))
@@ -1122,6 +2026,8 @@ def main() -> None:
             out=args.out,
             cell=args.cell,
             first_greedy=args.first_greedy,
+            instrument=args.instrument,
+            stats_interval=args.stats_interval,
         )
 
     print(
@@ -1157,6 +2063,15 @@ def main() -> None:
     )
     print("Saved:", outp)
 
+    if args.cache_snapshot:
+        snapshot_caches(args.cache_snapshot)
+        print("Cache snapshot:", args.cache_snapshot)
+        for row in cache_stats():
+            print(
+                f"  {row['name']:<10} size={row['size']} hits={row['hits']} "
+                f"misses={row['misses']} hit_ratio={row['hit_ratio']:.3f}"
+            )
+
 
 if __name__ == "__main__":
     main()
@@ -1,4 +1,96 @@
-from math import isqrt
+import sys
+from argparse import ArgumentParser
+from math import gcd, isqrt
+from time import perf_counter
+from typing import Iterator
+
+import numpy as np
+
+from odd_perfect import odd_perfect_possible
+from primality import is_prime
+from sieve import iter_primes, primes_array
+
+try:
+    import gmpy2
+except ImportError:  # optional: pure-Python big ints are used instead
+    gmpy2 = None
+
+# known Mersenne prime exponents (2^p - 1 prime)
+MERSENNE_EXPONENTS = (
+    2, 3, 5, 7, 13, 17, 19, 31, 61, 89, 107, 127, 521, 607, 1279, 2203, 2281,
+    3217, 4253, 4423, 9689, 9941, 11213, 19937, 21701, 23209, 44497, 86243,
+    110503, 132049, 216091, 756839, 859433, 1257787, 1398269, 2976221, 3021377,
+    6972593, 13466917, 20996011, 24036583, 25964951, 30402457, 32582657,
+    37156667, 42643801, 43112609, 57885161, 74207281, 77232917, 82589933,
+    136279841,
+)  # fmt: skip
+
+
+def _lucas_lehmer_generic(p: int) -> bool:
+    """Reference Lucas-Lehmer with a generic big-int `%` (odd prime p)."""
+    M = (1 << p) - 1
+    s = 4
+    for _ in range(p - 2):
+        s = (s * s - 2) % M
+    return s == 0
+
+
+def _lucas_lehmer_mersenne(p: int, use_gmpy2: bool) -> bool:
+    """
+    Lucas-Lehmer with the Mersenne reduction x mod (2^p - 1) = (x & M) + (x >> p):
+    only shifts, masks and adds instead of a big-int division per step.
+    """
+    one = gmpy2.mpz(1) if use_gmpy2 else 1
+    M = (one << p) - 1
+    s = one * 4
+    bias = M - 2  # keeps s*s - 2 non-negative
+    for _ in range(p - 2):
+        x = s * s + bias
+        x = (x & M) + (x >> p)
+        x = (x & M) + (x >> p)
+        if x >= M:
+            x -= M
+        s = x
+    return s == 0
+
+
+def lucas_lehmer(p: int, use_gmpy2: bool | None = None) -> bool:
+    """Return True if 2^p - 1 is prime.
+
+    - Deterministic Lucas-Lehmer test with fast Mersenne reduction
+    - Uses gmpy2 when installed (use_gmpy2=None), unless told otherwise
+    - Time Complexity: O(p) squarings of p-bit numbers
+    """
+    if p == 2:
+        return True
+    if not is_prime(p):
+        return False
+    if use_gmpy2 is None:
+        use_gmpy2 = gmpy2 is not None
+    return _lucas_lehmer_mersenne(p, use_gmpy2 and gmpy2 is not None)
+
+
+def benchmark_lucas_lehmer(max_exp: int = 11213, generic: bool = True) -> None:
+    """Time the LL variants over the known Mersenne exponents up to max_exp."""
+    variants = [("mersenne", lambda p: _lucas_lehmer_mersenne(p, False))]
+    if generic:
+        variants.insert(0, ("generic", _lucas_lehmer_generic))
+    if gmpy2 is not None:
+        variants.append(("gmpy2", lambda p: _lucas_lehmer_mersenne(p, True)))
+    print("p\t" + "\t".join(name for name, _ in variants))
+    for p in MERSENNE_EXPONENTS:
+        if p == 2:
+            continue
+        if p > max_exp:
+            break
+        row = []
+        for _, fn in variants:
+            start = perf_counter()
+            ok = fn(p)
+            row.append(f"{perf_counter() - start:.6f}")
+            if not ok:
+                print(f"LL reported 2^{p} - 1 composite!", file=sys.stderr)
+        print(f"{p}\t" + "\t".join(row))
 
 
 def is_perfectv1(n: int) -> bool:
@@ -48,16 +140,7 @@ def is_perfectv5(n: int) -> bool:
             return False
 
         # Lucas-Lehmer test for Mersenne primality (deterministic)
-        def _lucas_lehmer(prime_exp: int) -> bool:
-            if prime_exp == 2:
-                return True
-            M = (1 << prime_exp) - 1
-            s = 4
-            for _ in range(prime_exp - 2):
-                s = (s * s - 2) % M
-            return s == 0
-
-        return _lucas_lehmer(p)
+        return lucas_lehmer(p)
 
     # Odd fallback: faster divisor summing using 6k±1 iteration
     divisors_sum = 1
@@ -92,6 +175,20 @@ def is_perfectv5(n: int) -> bool:
     return divisors_sum == n
 
 
+def _odd_is_perfect(n: int) -> bool:
+    """Perfect-number answer for odd n > 1, without any divisor work.
+
+    The `odd_perfect` cascade proves every odd n up to 10**1500 is not
+    perfect. Its survivors are past that bound, where neither a divisor sum
+    nor `factorize` can finish, so they raise instead of hanging.
+    """
+    if odd_perfect_possible(n):
+        raise ValueError(
+            "odd n clears every odd-perfect filter; its divisor sum is out of reach"
+        )
+    return False
+
+
 def is_perfectv6(n: int) -> bool:
     """Optimized perfect-number test.
 
@@ -99,9 +196,10 @@ def is_perfectv6(n: int) -> bool:
     - For even numbers, verify Euclid–Euler form and use the Lucas–Lehmer
       test (deterministic for Mersenne numbers) to check whether the
       Mersenne factor is prime.
-    - For odd numbers, use `isqrt` and iterate only over 6k±1 candidates
-      (after handling 2 and 3) with early exit when the divisor sum
-      exceeds `n`.
+    - For odd numbers, the `odd_perfect` filter cascade (proven lower
+      bound, one CRT residue lookup, Euler form) instead of trial division:
+      rejected n is not perfect; a survivor is past 10**1500 and raises
+      ValueError (see `_odd_is_perfect`).
     This keeps the function deterministic and often faster for very
     large candidates that match the Euclid–Euler structure.
     """
@@ -119,109 +217,10 @@ def is_perfectv6(n: int) -> bool:
             return False
 
         # Lucas-Lehmer test for Mersenne primality (deterministic)
-        def _lucas_lehmer(prime_exp: int) -> bool:
-            if prime_exp == 2:
-                return True
-            M = (1 << prime_exp) - 1
-            s = 4
-            for _ in range(prime_exp - 2):
-                s = (s * s - 2) % M
-            return s == 0
-
-        return _lucas_lehmer(p)
-
-    # Odd fallback: highly optimized for non-perfects
-    if n == 1:
-        return False
-    # All known perfect numbers are even; no odd perfect < 10**1500
-    if n % 2 == 1:
-        # Quick filters for odd perfects
-        if n < 10**1500:
-            # Must be 1 mod 4
-            if n % 4 != 1:
-                return False
-            # Must be 1 or 9 mod 12
-            if n % 12 not in (1, 9):
-                return False
-            # Must not be divisible by 3, 5, or 7
-            if n % 3 == 0 or n % 5 == 0 or n % 7 == 0:
-                return False
-            # Must have at least 9 distinct prime factors (skip expensive check, but could add more filters)
-        else:
-            # No known odd perfects below this bound
-            return False
-    divisors_sum = 1
-    limit = isqrt(n)
-    seen = set([1, n])
-    wheel = [
-        2,
-        4,
-        2,
-        4,
-        6,
-        2,
-        6,
-        4,
-        2,
-        4,
-        6,
-        6,
-        2,
-        6,
-        4,
-        2,
-        6,
-        4,
-        6,
-        8,
-        4,
-        2,
-        4,
-        2,
-        4,
-        8,
-        6,
-        4,
-        6,
-        2,
-        4,
-        6,
-        2,
-        6,
-        6,
-        4,
-        2,
-        4,
-        6,
-        2,
-        6,
-        4,
-        2,
-        4,
-        2,
-        10,
-        2,
-        10,
-    ]
-    wlen = len(wheel)
-    i = 2
-    wi = 0
-    while i <= limit:
-        if n % i == 0:
-            other = n // i
-            if i not in seen:
-                divisors_sum += i
-                seen.add(i)
-                if divisors_sum > n:
-                    return False
-            if other != i and other not in seen:
-                divisors_sum += other
-                seen.add(other)
-                if divisors_sum > n:
-                    return False
-        i += wheel[wi]
-        wi = (wi + 1) % wlen
-    return divisors_sum == n
+        return lucas_lehmer(p)
+
+    # Odd path: no divisor work (an O(√n) sum never finishes past 10**1500)
+    return _odd_is_perfect(n)
 
 
 def is_perfectv2(n: int) -> bool:
@@ -250,44 +249,9 @@ def is_perfectv3(n: int) -> bool:
     """Return True if `n` is a perfect number.
 
     - Fast even check using Euclid-Euler (2^(p-1)*(2^p-1) with Mersenne prime)
-    - Miller-Rabin primality check reused locally
+    - Mersenne factor checked with the shared `primality.is_prime` engine
     - Fallback O(√n) divisor-summing with early exit
     """
-
-    # local Miller-Rabin (small deterministic bases for typical ints)
-    def _is_probable_prime_local(a_n: int) -> bool:
-        if a_n < 2:
-            return False
-        small_primes = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29)
-        for p in small_primes:
-            if a_n % p == 0:
-                return a_n == p
-
-        d = a_n - 1
-        s = 0
-        while d % 2 == 0:
-            d //= 2
-            s += 1
-
-        bases = (2, 325, 9375, 28178, 450775, 9780504, 1795265022)
-
-        def check(a: int) -> bool:
-            x = pow(a, d, a_n)
-            if x == 1 or x == a_n - 1:
-                return True
-            for _ in range(s - 1):
-                x = (x * x) % a_n
-                if x == a_n - 1:
-                    return True
-            return False
-
-        for a in bases:
-            if a % a_n == 0:
-                continue
-            if not check(a):
-                return False
-        return True
-
     if n <= 1:
         return False
 
@@ -300,7 +264,7 @@ def is_perfectv3(n: int) -> bool:
             e += 1
         p = e + 1
         mersenne = (1 << p) - 1
-        if m == mersenne and _is_probable_prime_local(m):
+        if m == mersenne and is_prime(m):
             return True
         return False
 
@@ -323,36 +287,9 @@ def is_perfectv4(n: int) -> bool:
     """Return True if `n` is a perfect number.
 
     - Fast even check using Euclid-Euler (2^(p-1)*(2^p-1) with Mersenne prime)
-    - Miller-Rabin primality check for Mersenne candidates
+    - Mersenne candidates checked with the shared `primality.is_prime` engine
     - Fallback O(√n) divisor-summing with early exit
     """
-
-    def _is_probable_prime(num: int) -> bool:
-        """Miller-Rabin with deterministic bases for typical integers."""
-        if num < 2:
-            return False
-        for p in (2, 3, 5, 7, 11, 13, 17, 19, 23, 29):
-            if num % p == 0:
-                return num == p
-
-        d = num - 1
-        s = 0
-        while d % 2 == 0:
-            d //= 2
-            s += 1
-
-        def check(a: int) -> bool:
-            x = pow(a, d, num)
-            if x == 1 or x == num - 1:
-                return True
-            for _ in range(s - 1):
-                x = (x * x) % num
-                if x == num - 1:
-                    return True
-            return False
-
-        return all(check(a) for a in (2, 325, 9375, 28178, 450775) if a % num != 0)
-
     if n <= 1:
         return False
 
@@ -360,7 +297,7 @@ def is_perfectv4(n: int) -> bool:
     if n % 2 == 0:
         e = (n & -n).bit_length() - 1  # Count trailing zeros
         mersenne = (1 << (e + 1)) - 1
-        return n == (1 << e) * mersenne and _is_probable_prime(mersenne)
+        return n == (1 << e) * mersenne and is_prime(mersenne)
 
     # Odd fallback: sqrt method with early exit
     divisors_sum = 1
@@ -373,3 +310,214 @@ def is_perfectv4(n: int) -> bool:
                 return False
 
     return divisors_sum == n
+
+
+# ---------- divisor-sum engine (factorization based) ----------
+# trial-division wheel: primes below 1000
+_WHEEL_PRIMES = tuple(iter_primes(1000))
+
+
+def _pollard_brent(n: int) -> int:
+    """Return a non-trivial factor of the odd composite n (Brent's rho variant).
+
+    - Expected Time Complexity: O(n^(1/4)) modular multiplications
+    """
+    for c in range(1, n):
+        y, r, q, g = 2, 1, 1, 1
+        m = 128
+        x = ys = y
+        while g == 1:
+            x = y
+            for _ in range(r):
+                y = (y * y + c) % n
+            k = 0
+            while k < r and g == 1:
+                ys = y
+                for _ in range(min(m, r - k)):
+                    y = (y * y + c) % n
+                    q = q * abs(x - y) % n
+                g = gcd(q, n)
+                k += m
+            r *= 2
+        if g == n:
+            # batched gcd overshot: step back one at a time
+            g = 1
+            while g == 1:
+                ys = (ys * ys + c) % n
+                g = gcd(abs(x - ys), n)
+        if g != n:
+            return g
+    raise ValueError(f"no factor found for {n}")
+
+
+def factorize(n: int) -> dict[int, int]:
+    """Return the prime factorization of n > 0 as {prime: exponent}.
+
+    - Trial division by the primes below 1000
+    - Remaining cofactors split with Pollard-Brent rho, and `is_prime`
+      (Miller-Rabin / BPSW) decides when a cofactor is prime
+    """
+    factors: dict[int, int] = {}
+    for p in _WHEEL_PRIMES:
+        if p * p > n:
+            break
+        if n % p == 0:
+            e = 0
+            while n % p == 0:
+                n //= p
+                e += 1
+            factors[p] = e
+    stack = [n] if n > 1 else []
+    while stack:
+        m = stack.pop()
+        if is_prime(m):
+            factors[m] = factors.get(m, 0) + 1
+            continue
+        r = isqrt(m)
+        if r * r == m:
+            stack += [r, r]
+            continue
+        d = _pollard_brent(m)
+        stack += [d, m // d]
+    return factors
+
+
+def sigma(n: int) -> int:
+    """Sum of all divisors of n > 0, computed multiplicatively.
+
+    - sigma(p^e) = (p^(e+1) - 1) / (p - 1)
+    - Cost dominated by `factorize`, not by √n
+    """
+    total = 1
+    for p, e in factorize(n).items():
+        total *= (p ** (e + 1) - 1) // (p - 1)
+    return total
+
+
+def aliquot_sum(n: int) -> int:
+    """Sum of the proper divisors of n > 0."""
+    return sigma(n) - n
+
+
+def classify(n: int) -> str:
+    """Return "perfect", "abundant" or "deficient" for n > 0."""
+    s = aliquot_sum(n)
+    if s == n:
+        return "perfect"
+    return "abundant" if s > n else "deficient"
+
+
+def is_perfect(n: int) -> bool:
+    """Return True if `n` is a perfect number.
+
+    - Even n: Euclid-Euler form + `lucas_lehmer`
+    - Odd n: the `odd_perfect` filter cascade, never `sigma`; a survivor
+      is past 10**1500 and raises ValueError (see `_odd_is_perfect`)
+    """
+    if n <= 1:
+        return False
+    if n % 2 == 0:
+        e = (n & -n).bit_length() - 1
+        mersenne = (1 << (e + 1)) - 1
+        return n == (1 << e) * mersenne and lucas_lehmer(e + 1)
+    return _odd_is_perfect(n)
+
+
+def is_abundant(n: int) -> bool:
+    return n > 0 and aliquot_sum(n) > n
+
+
+def is_deficient(n: int) -> bool:
+    return n > 0 and aliquot_sum(n) < n
+
+
+def is_amicable(n: int) -> bool:
+    """Return True if n belongs to an amicable pair (s(s(n)) == n, s(n) != n)."""
+    if n <= 1:
+        return False
+    m = aliquot_sum(n)
+    return m != n and m > 1 and aliquot_sum(m) == n
+
+
+# ---------- bulk divisor sums (sieve based) ----------
+# numbers per segment of the segmented sigma sieve (~32 MiB of int64 work arrays)
+SIGMA_SEGMENT = 1 << 21
+
+
+def sigma_segment(lo: int, hi: int) -> np.ndarray:
+    """Return sigma(n) for n in [lo, hi) as an int64 array (sigma(0) = 0).
+
+    - Vectorized sieve over the primes p <= √hi: every multiple of p^k
+      trades its sigma(p^(k-1)) factor for sigma(p^k), and p is divided
+      out of a running cofactor
+    - What is left of the cofactor is 1 or a single prime q > √hi, which
+      contributes (q + 1)
+    - Time Complexity: O((hi - lo) log log hi) element operations
+    """
+    size = hi - lo
+    sig = np.ones(size, dtype=np.int64)
+    rem = np.arange(lo, hi, dtype=np.int64)
+    for p in primes_array(isqrt(max(hi - 1, 0))).tolist():
+        pk = p
+        prev = 1
+        cur = 1 + p
+        while pk < hi:
+            start = (-lo) % pk
+            sig[start::pk] //= prev
+            sig[start::pk] *= cur
+            rem[start::pk] //= p
+            pk *= p
+            prev = cur
+            cur = cur * p + 1
+    big = rem > 1
+    sig[big] *= rem[big] + 1
+    if lo == 0 and size:
+        sig[0] = 0
+    return sig
+
+
+def sigma_table(N: int) -> np.ndarray:
+    """sigma(n) for 0 <= n <= N as one int64 array (index = n)."""
+    return sigma_segment(0, N + 1)
+
+
+def iter_sigma_segments(
+    lo: int, hi: int, segment: int = SIGMA_SEGMENT
+) -> Iterator[tuple[int, np.ndarray]]:
+    """Yield (start, sigma array) blocks covering [lo, hi], for N beyond RAM."""
+    for start in range(lo, hi + 1, segment):
+        yield start, sigma_segment(start, min(start + segment, hi + 1))
+
+
+def classify_range(
+    lo: int, hi: int, segment: int = SIGMA_SEGMENT
+) -> dict[str, np.ndarray | int]:
+    """Classify every n in [max(lo, 1), hi] in one vectorized pass per segment.
+
+    Returns the perfect numbers, the abundant numbers and the count of
+    deficient numbers (usually the vast majority).
+    """
+    perfect = []
+    abundant = []
+    deficient = 0
+    for start, sig in iter_sigma_segments(max(lo, 1), hi, segment):
+        doubled = 2 * np.arange(start, start + sig.size, dtype=np.int64)
+        perfect.append(np.flatnonzero(sig == doubled) + start)
+        abundant.append(np.flatnonzero(sig > doubled) + start)
+        deficient += int(np.count_nonzero(sig < doubled))
+    empty = np.zeros(0, dtype=np.int64)
+    return {
+        "perfect": np.concatenate(perfect) if perfect else empty,
+        "abundant": np.concatenate(abundant) if abundant else empty,
+        "deficient": deficient,
+    }
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("--bench-ll", action="store_true", help="sweep LL variants")
+    parser.add_argument("--max-exp", type=int, default=11213)
+    parser.add_argument("--no-generic", action="store_true")
+    args = parser.parse_args()
+    if args.bench_ll:
+        benchmark_lucas_lehmer(args.max_exp, generic=not args.no_generic)
@@ -0,0 +1,165 @@
+"""
+Perfect-number search by Mersenne exponents.
+
+Every even perfect number is 2^(p-1) * (2^p - 1) with 2^p - 1 prime, so
+instead of scanning consecutive integers we enumerate prime exponents p,
+discard most of them by trial factoring 2^p - 1, and run Lucas-Lehmer only
+on the survivors.
+"""
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+
+from tqdm import tqdm
+
+from perfect_nums import lucas_lehmer
+from sieve import primes_in_range
+
+# trial-factoring depth: candidates q = 2kp + 1 for k <= TF_DEPTH * p.
+# Lucas-Lehmer costs ~p squarings of p-bit numbers while each candidate is a
+# single small pow(), so a depth linear in p keeps factoring a small fraction
+# of the LL cost while still removing many composite 2^p - 1.
+TF_DEPTH = 1
+
+# seconds between checkpoint writes
+CHECKPOINT_EVERY = 10.0
+
+
+def perfect_from_exponent(p: int) -> int:
+    """Even perfect number 2^(p-1) * (2^p - 1) for a Mersenne exponent p."""
+    return (1 << (p - 1)) * ((1 << p) - 1)
+
+
+def trial_factor(p: int, max_k: int | None = None) -> int | None:
+    """Return a factor q = 2kp + 1 (k <= max_k) of 2^p - 1, or None.
+
+    - Any factor of 2^p - 1 (odd prime p) has the form q = 2kp + 1 with
+      q ≡ ±1 (mod 8), so only those candidates are tried
+    - Candidates divisible by 3, 5 or 7 are skipped (their prime factors
+      are smaller candidates that were already tried)
+    - q divides 2^p - 1 iff pow(2, p, q) == 1
+    """
+    if max_k is None:
+        max_k = TF_DEPTH * p
+    mersenne = (1 << p) - 1
+    limit = min(2 * max_k * p + 2, mersenne)
+    step = 2 * p
+    q = step + 1
+    while q < limit:
+        if (
+            q % 8 in (1, 7)
+            and q % 3 != 0
+            and q % 5 != 0
+            and q % 7 != 0
+            and pow(2, p, q) == 1
+        ):
+            return q
+        q += step
+    return None
+
+
+def _test_exponent(task: tuple[int, int | None]) -> tuple[int, bool]:
+    """Pool worker: (p, max_k) -> (p, 2^p - 1 is prime)."""
+    p, max_k = task
+    if p > 2 and trial_factor(p, max_k) is not None:
+        return p, False
+    return p, lucas_lehmer(p)
+
+
+def _load_checkpoint(path: str | None, key: dict) -> tuple[int, list[int]]:
+    if path is None or not os.path.exists(path):
+        return 0, []
+    with open(path, "r") as f:
+        state = json.load(f)
+    if state.get("key") != key:
+        return 0, []
+    return int(state["done"]), [int(p) for p in state["found"]]
+
+
+def _save_checkpoint(path: str | None, key: dict, done: int, found: list[int]):
+    if path is None:
+        return
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump({"key": key, "done": done, "found": found}, f)
+    os.replace(tmp, path)
+
+
+def search_mersenne_exponents(
+    p_lo: int,
+    p_hi: int,
+    workers: int | None = None,
+    max_k: int | None = None,
+    checkpoint: str | None = None,
+    progress: bool = False,
+) -> list[int]:
+    """Return the exponents p in [p_lo, p_hi] for which 2^p - 1 is prime.
+
+    - Prime exponents come from the segmented sieve
+    - max_k bounds the trial-factoring depth (default TF_DEPTH * p)
+    - Each exponent is trial factored, then Lucas-Lehmer tested, on a
+      process pool (results are consumed in order)
+    - With `checkpoint`, progress is saved to a JSON file every
+      CHECKPOINT_EVERY seconds and a rerun with the same arguments resumes
+    """
+    if p_hi < max(p_lo, 2):
+        return []
+    exponents = primes_in_range(max(p_lo, 2), p_hi).tolist()
+    key = {"p_lo": p_lo, "p_hi": p_hi, "max_k": max_k}
+    done, found = _load_checkpoint(checkpoint, key)
+
+    tasks = [(p, max_k) for p in exponents[done:]]
+    bar = (
+        tqdm(total=len(exponents), initial=done, desc="Exponents", unit="p")
+        if progress
+        else None
+    )
+    last_save = perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for p, is_mersenne in pool.map(_test_exponent, tasks, chunksize=1):
+            done += 1
+            if is_mersenne:
+                found.append(p)
+                if bar is not None:
+                    tqdm.write(f"Found Mersenne prime exponent: {p}")
+            if bar is not None:
+                bar.update(1)
+            if perf_counter() - last_save >= CHECKPOINT_EVERY:
+                _save_checkpoint(checkpoint, key, done, found)
+                last_save = perf_counter()
+    if bar is not None:
+        bar.close()
+    _save_checkpoint(checkpoint, key, done, found)
+    return found
+
+
+def exponent_bounds(lo: int, hi: int) -> tuple[int, int]:
+    """Smallest and largest p with lo <= 2^(p-1) * (2^p - 1) <= hi."""
+    # 2^(2p-2) <= N_p < 2^(2p-1), so p ~ bit_length / 2
+    p_lo = max(2, (lo.bit_length() + 1) // 2 - 1)
+    while perfect_from_exponent(p_lo) < lo:
+        p_lo += 1
+    p_hi = max(2, (hi.bit_length() + 1) // 2 + 1)
+    while p_hi >= 2 and perfect_from_exponent(p_hi) > hi:
+        p_hi -= 1
+    return p_lo, p_hi
+
+
+def perfect_numbers_in_range(
+    lo: int,
+    hi: int,
+    workers: int | None = None,
+    max_k: int | None = None,
+    checkpoint: str | None = None,
+    progress: bool = False,
+) -> list[int]:
+    """Even perfect numbers in the decimal range [lo, hi], in increasing order."""
+    if lo > hi:
+        return []
+    p_lo, p_hi = exponent_bounds(lo, hi)
+    exponents = search_mersenne_exponents(
+        p_lo, p_hi, workers, max_k, checkpoint, progress
+    )
+    return [perfect_from_exponent(p) for p in exponents]
@@ -1,8 +1,33 @@
+"""
+Empirical complexity analysis.
+
+Times fn(n) over a geometric schedule of n (several samples per point),
+fits t(n) = a + c * g(n) for each candidate model g by weighted least
+squares (a >= 0) and ranks the models by Akaike weight, which is reported as the
+confidence of the best fit.
+
+    python plot_complexity.py --func perfect_nums:is_perfectv5 --save plot.png
+"""
+
+import importlib
+import statistics
 import time
+from argparse import ArgumentParser
+from math import log, sqrt
 
-import matplotlib.pyplot as plt
+import numpy as np
 
-import perfect_nums
+# candidate growth models g(n)
+MODELS = {
+    "1": lambda n: np.ones_like(n),
+    "log n": lambda n: np.log(n),
+    "√n": lambda n: np.sqrt(n),
+    "n": lambda n: n,
+    "n log n": lambda n: n * np.log(n),
+    "n√n": lambda n: n * np.sqrt(n),
+    "n²": lambda n: n**2,
+    "n³": lambda n: n**3,
+}
 
 
 def time_function(fn, n, repeats=1):
@@ -14,29 +39,181 @@ def time_function(fn, n, repeats=1):
     return (end - start) / repeats
 
 
-if __name__ == "__main__":
-    # User-configurable interval and sampling
-    start_n = 2  # <-- change start value here
-    end_n = 1000  # <-- change end value here
-    step = 1  # step between n values
-    repeats = 1000  # increase if function is very fast (e.g., 100 or 1000)
-    # Function to profile
-    func = perfect_nums.is_perfectv5
-
-    ns = list(range(start_n, end_n + 1, step))
-    times = []
+def geometric_schedule(n_min: int, n_max: int, points: int) -> list[int]:
+    """About `points` distinct integers spaced geometrically in [n_min, n_max]."""
+    n_min = max(1, n_min)
+    if points <= 1 or n_max <= n_min:
+        return [n_min]
+    ratio = (n_max / n_min) ** (1 / (points - 1))
+    return sorted({round(n_min * ratio**i) for i in range(points)})
+
+
+def make_input(n: int, kind: str) -> int:
+    """Map a schedule point to the actual argument ("n", "odd" or "prime")."""
+    if kind == "odd":
+        return n | 1
+    if kind == "prime":
+        from primality import is_prime
+
+        while not is_prime(n):
+            n += 1
+    return n
+
+
+def measure(
+    fn, ns: list[int], samples: int = 5, min_time: float = 0.01, inputs: str = "n"
+) -> tuple[np.ndarray, np.ndarray]:
+    """Median seconds per call of fn at each n.
+
+    Each of the `samples` samples repeats the call until it lasts at least
+    `min_time`, so timer resolution does not swamp fast calls.
+    """
+    medians = []
     for n in ns:
-        t = time_function(func, n, repeats=repeats)
-        times.append(t)
-
-    plt.plot(ns, times, linestyle="None", marker="o", label=f"{func.__name__}")
-    # Plot the line y = x for comparison
-    scale = max(times) / max(ns)
-    plt.plot(ns, [scale * x for x in ns], "--", color="red", label="y = x (scaled)")
-    plt.xlabel("n")
-    plt.ylabel("time (s)")
-    plt.title(f"Execution time of {func.__name__} (repeats={repeats})")
-    plt.grid(True)
-    plt.legend()
-    plt.tight_layout()
-    plt.show()
+        arg = make_input(n, inputs)
+        fn(arg)  # warmup
+        loops = 1
+        while time_function(fn, arg, loops) * loops < min_time and loops < 1 << 20:
+            loops *= 2
+        medians.append(
+            statistics.median(time_function(fn, arg, loops) for _ in range(samples))
+        )
+    return np.array(ns, dtype=np.float64), np.array(medians)
+
+
+def fit_models(ns: np.ndarray, times: np.ndarray, models=MODELS) -> list[dict]:
+    """Fit t = a + c * g(n) for every model, best first.
+
+    - Residuals are relative (weights 1/t), so small and large n count alike
+    - The fit is non-negative: a negative intercept (common with timing noise
+      when the true overhead is ~0) is clamped to 0 by refitting t = c * g(n);
+      models whose growth term still has c <= 0 are discarded
+    - `confidence` is the Akaike weight of each model among the valid fits,
+      counting only the parameters that are not clamped
+    """
+    m = len(ns)
+    w = 1.0 / times
+    tw = times * w
+    fits = []
+    for name, g in models.items():
+        gx = g(ns)
+        if name == "1":
+            a = float(np.sum(tw * w) / np.sum(w * w))
+            c = 0.0
+            k = 1
+        else:
+            design = np.column_stack([np.ones_like(ns), gx]) * w[:, None]
+            (a, c), *_ = np.linalg.lstsq(design, tw, rcond=None)
+            k = 2
+            if a < 0:
+                gw = gx * w
+                a = 0.0
+                c = float(np.sum(tw * gw) / np.sum(gw * gw))
+                k = 1
+            if c <= 0:
+                continue
+        pred = a + c * gx
+        rss = float(np.sum(((times - pred) * w) ** 2))
+        aic = m * log(max(rss, 1e-300) / m) + 2 * k
+        fits.append({"model": name, "a": a, "c": c, "rss": rss, "aic": aic})
+    if not fits:
+        return []
+    best_aic = min(f["aic"] for f in fits)
+    norm = sum(np.exp(-(f["aic"] - best_aic) / 2) for f in fits)
+    for f in fits:
+        f["confidence"] = float(np.exp(-(f["aic"] - best_aic) / 2) / norm)
+        f["rel_rms"] = sqrt(f["rss"] / m)
+    fits.sort(key=lambda f: f["aic"])
+    return fits
+
+
+def loglog_slope(ns: np.ndarray, times: np.ndarray) -> float:
+    """Empirical exponent: slope of log t against log n over the upper half."""
+    half = len(ns) // 2
+    x = np.log(ns[half:])
+    y = np.log(times[half:])
+    if len(x) < 2:
+        return float("nan")
+    return float(np.polyfit(x, y, 1)[0])
+
+
+def report(name: str, fits: list[dict], slope: float) -> None:
+    print(f"{name}: empirical exponent (log-log, upper half) = {slope:.2f}")
+    print(f"{'model':<10}{'confidence':>12}{'rel. RMS':>12}{'c':>14}{'a':>14}")
+    for f in fits:
+        print(
+            f"{f['model']:<10}{f['confidence']:>12.3f}{f['rel_rms']:>12.4f}"
+            f"{f['c']:>14.4g}{f['a']:>14.4g}"
+        )
+    if fits:
+        best = fits[0]
+        print(f"best fit: O({best['model']}) (confidence {best['confidence']:.1%})")
+
+
+def plot(name: str, ns, times, fits, out: str | None, show: bool, top: int = 3):
+    import matplotlib
+
+    if not show:
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots()
+    ax.loglog(ns, times, linestyle="None", marker="o", label=name)
+    for f in fits[:top]:
+        pred = f["a"] + f["c"] * MODELS[f["model"]](ns)
+        ax.loglog(
+            ns,
+            pred,
+            "--",
+            label=f"{f['a']:.2g} + c·{f['model']} ({f['confidence']:.0%})",
+        )
+    ax.set_xlabel("n")
+    ax.set_ylabel("time per call (s)")
+    ax.set_title(f"Execution time of {name}")
+    ax.grid(True, which="both", alpha=0.3)
+    ax.legend()
+    fig.tight_layout()
+    if out:
+        fig.savefig(out, dpi=120)
+        print(f"saved {out}")
+    if show:
+        plt.show()
+    plt.close(fig)
+
+
+def resolve(spec: str):
+    """'module:function' -> callable."""
+    module, _, attr = spec.partition(":")
+    return getattr(importlib.import_module(module), attr)
+
+
+if __name__ == "__main__":
+    p = ArgumentParser()
+    p.add_argument(
+        "--func", default="perfect_nums:is_perfectv5", help="module:function"
+    )
+    p.add_argument("--n-min", type=int, default=2)
+    p.add_argument("--n-max", type=int, default=10**6)
+    p.add_argument("--points", type=int, default=20)
+    p.add_argument("--samples", type=int, default=5)
+    p.add_argument("--min-time", type=float, default=0.01)
+    p.add_argument(
+        "--inputs",
+        choices=("n", "odd", "prime"),
+        default="n",
+        help="argument passed for each n (prime = next prime >= n, the worst case "
+        "for trial division)",
+    )
+    p.add_argument("--save", default=None, help="write the plot to this file")
+    p.add_argument(
+        "--show", action="store_true", help="open a window (needs a display)"
+    )
+    args = p.parse_args()
+
+    func = resolve(args.func)
+    ns = geometric_schedule(args.n_min, args.n_max, args.points)
+    xs, ts = measure(func, ns, args.samples, args.min_time, args.inputs)
+    fits = fit_models(xs, ts)
+    report(func.__name__, fits, loglog_slope(xs, ts))
+    if args.save or args.show:
+        plot(func.__name__, xs, ts, fits, args.save, args.show)
@@ -1,6 +1,12 @@
 import math
+import mmap
+import os
 import time
 
+import numpy as np
+
+from sieve import iter_odd_bitmap
+
 
 def is_primev1(n: int) -> bool:
     """
@@ -116,6 +122,299 @@ def is_primev7(n: int) -> bool:
     return True
 
 
+# ---------- shared engine: trial division + Miller-Rabin / BPSW ----------
+_SMALL_PRIMES = tuple(
+    p for p in range(2, 1000) if all(p % d != 0 for d in range(2, math.isqrt(p) + 1))
+)
+
+# deterministic bases for n < 2^64 (Jim Sinclair)
+_MR_BASES_64 = (2, 325, 9375, 28178, 450775, 9780504, 1795265022)
+
+
+def _strong_probable_prime(n: int, a: int) -> bool:
+    """
+    Strong probable-prime test (one Miller-Rabin round) of odd n to base a.
+    - Time Complexity: O(log n) modular multiplications
+    """
+    a %= n
+    if a == 0:
+        return True
+    d = n - 1
+    s = (d & -d).bit_length() - 1
+    d >>= s
+    x = pow(a, d, n)
+    if x == 1 or x == n - 1:
+        return True
+    for _ in range(s - 1):
+        x = x * x % n
+        if x == n - 1:
+            return True
+    return False
+
+
+def _jacobi(a: int, n: int) -> int:
+    """Jacobi symbol (a/n) for odd n > 0."""
+    a %= n
+    result = 1
+    while a:
+        while a % 2 == 0:
+            a //= 2
+            if n % 8 in (3, 5):
+                result = -result
+        a, n = n, a
+        if a % 4 == 3 and n % 4 == 3:
+            result = -result
+        a %= n
+    return result if n == 1 else 0
+
+
+def _strong_lucas_probable_prime(n: int) -> bool:
+    """
+    Strong Lucas probable-prime test with Selfridge parameters (method A).
+    Expects odd n > 2 that is not a perfect square.
+    - Time Complexity: O(log n) modular multiplications
+    """
+    D = 5
+    while True:
+        j = _jacobi(D, n)
+        if j == -1:
+            break
+        if j == 0 and abs(D) != n:
+            return False
+        D = -D - 2 if D > 0 else -D + 2
+    P = 1
+    Q = (1 - D) // 4
+
+    d = n + 1
+    s = (d & -d).bit_length() - 1
+    d >>= s
+
+    U = 1
+    V = P
+    Qk = Q % n
+    for bit in bin(d)[3:]:
+        U = U * V % n
+        V = (V * V - 2 * Qk) % n
+        Qk = Qk * Qk % n
+        if bit == "1":
+            U, V = P * U + V, D * U + P * V
+            if U % 2:
+                U += n
+            U = (U // 2) % n
+            if V % 2:
+                V += n
+            V = (V // 2) % n
+            Qk = Qk * Q % n
+    if U == 0 or V == 0:
+        return True
+    for _ in range(s - 1):
+        V = (V * V - 2 * Qk) % n
+        if V == 0:
+            return True
+        Qk = Qk * Qk % n
+    return False
+
+
+# ---------- optional persistent lookup table (mmap'd odd-number bitmap) ----------
+DEFAULT_TABLE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "prime_table.bin"
+)
+
+# bit i of the table says whether 2*i + 1 is prime; disabled while limit is 0
+_table: mmap.mmap | None = None
+_table_limit = 0
+
+
+def build_prime_table(path: str = DEFAULT_TABLE_PATH, limit: int = 1 << 32) -> str:
+    """
+    Write the odd-number bitmap for n < limit to `path` (limit / 16 bytes,
+    256 MiB for 2^32). Generated segment by segment with the odd-only sieve,
+    and renamed into place only when complete.
+    """
+    limit -= limit % 16
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        for chunk in iter_odd_bitmap(limit):
+            f.write(chunk)
+    os.replace(tmp, path)
+    return path
+
+
+def enable_prime_table(
+    path: str = DEFAULT_TABLE_PATH, limit: int = 1 << 32, build: bool = True
+) -> int:
+    """
+    Memory-map the lookup table so `is_prime` answers n below its bound in O(1).
+    Builds the file first if it does not exist (and `build` is set); an
+    existing file is only mapped, so startup cost is near zero.
+    Returns the bound in effect (0 if no table is available).
+    """
+    global _table, _table_limit
+    if not os.path.exists(path):
+        if not build:
+            return 0
+        build_prime_table(path, limit)
+    disable_prime_table()
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return 0
+        _table = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    _table_limit = 16 * len(_table)
+    return _table_limit
+
+
+def disable_prime_table() -> None:
+    global _table, _table_limit
+    _table_limit = 0
+    if _table is not None:
+        _table.close()
+        _table = None
+
+
+def is_prime(n: int) -> bool:
+    """
+    Shared primality engine.
+    - Trial division by the primes below 1000 as a prefilter.
+    - n < 2^64: deterministic Miller-Rabin with 7 fixed bases.
+    - Larger n: strong BPSW (Miller-Rabin base 2 + strong Lucas), with no
+      known counterexample.
+    - Time Complexity: O(log^3 n) with schoolbook multiplication
+    - n below the bound of an enabled lookup table: O(1) bitmap read.
+    - Space Complexity: O(1)
+    """
+    if n < 2:
+        return False
+    if n < _table_limit:
+        if n & 1 == 0:
+            return n == 2
+        i = n >> 1
+        return (_table[i >> 3] >> (i & 7)) & 1 == 1
+    for p in _SMALL_PRIMES:
+        if n % p == 0:
+            return n == p
+    if n < 1_000_000:
+        return True
+    if n < 1 << 64:
+        return all(_strong_probable_prime(n, a) for a in _MR_BASES_64)
+    if not _strong_probable_prime(n, 2):
+        return False
+    r = math.isqrt(n)
+    if r * r == n:
+        return False
+    return _strong_lucas_probable_prime(n)
+
+
+# ---------- batch engine: NumPy prefilter + vectorized Miller-Rabin ----------
+# first 303 primes (all primes below 2000)
+_PREFILTER_PRIMES = tuple(
+    p for p in range(2, 2000) if all(p % d != 0 for d in range(2, math.isqrt(p) + 1))
+)
+
+# bases 2, 7, 61 are deterministic for n < 4_759_123_141 (> 2^32)
+_MR_BASES_32 = (2, 7, 61)
+
+
+def _powmod_u64(base: np.ndarray, exp: np.ndarray, mod: np.ndarray) -> np.ndarray:
+    """Elementwise base**exp % mod for uint64 arrays with mod < 2^32."""
+    result = np.ones_like(mod)
+    base = base % mod
+    exp = exp.copy()
+    while exp.any():
+        odd = (exp & 1).astype(bool)
+        result = np.where(odd, result * base % mod, result)
+        base = base * base % mod
+        exp >>= 1
+    return result
+
+
+def _miller_rabin_u32(n: np.ndarray) -> np.ndarray:
+    """
+    Vectorized deterministic Miller-Rabin for odd uint64 n in (61, 2^32).
+    Products of two residues stay below 2^64, so no Python ints are needed.
+    """
+    d = n - 1
+    s = np.zeros_like(n)
+    even = (d & 1) == 0
+    while even.any():
+        d = np.where(even, d >> 1, d)
+        s += even
+        even = (d & 1) == 0
+    n_minus_1 = n - 1
+    ok = np.ones(n.shape, dtype=bool)
+    for a in _MR_BASES_32:
+        x = _powmod_u64(np.full_like(n, a), d, n)
+        good = (x == 1) | (x == n_minus_1)
+        for r in range(1, int(s.max())):
+            active = (r < s) & ~good
+            if not active.any():
+                break
+            x = np.where(active, x * x % n, x)
+            good |= active & (x == n_minus_1)
+        ok &= good
+    return ok
+
+
+def is_prime_many(values) -> np.ndarray:
+    """
+    Boolean mask of which entries of an int64 array are prime.
+    - Vectorized divisibility by the primes below 2000, applied to the
+      shrinking set of survivors.
+    - Survivors below 2^32: vectorized Miller-Rabin in uint64.
+    - Larger survivors fall back to `is_prime` on Python ints.
+    - Entries below the bound of an enabled lookup table are read from it.
+    """
+    arr = np.asarray(values, dtype=np.int64)
+    flat = arr.ravel()
+    result = np.zeros(flat.shape, dtype=bool)
+
+    idx = np.flatnonzero(flat >= 2)
+    if _table_limit:
+        # lookup-table path for everything below its bound
+        in_table = flat[idx] < _table_limit
+        hit = idx[in_table]
+        vals = flat[hit]
+        odd = (vals & 1) == 1
+        bits = np.frombuffer(_table, dtype=np.uint8)
+        i = vals[odd] >> 1
+        result[hit[odd]] = (bits[i >> 3] >> (i & 7)) & 1 == 1
+        result[hit[~odd]] = vals[~odd] == 2
+        idx = idx[~in_table]
+    vals = flat[idx]
+    for p in _PREFILTER_PRIMES:
+        if idx.size == 0:
+            break
+        divisible = vals % p == 0
+        result[idx[divisible & (vals == p)]] = True
+        keep = ~divisible
+        idx = idx[keep]
+        vals = vals[keep]
+
+    # no factor below 2000 means prime when n < 2000^2
+    small = vals < _PREFILTER_PRIMES[-1] ** 2
+    result[idx[small]] = True
+    idx = idx[~small]
+    vals = vals[~small]
+
+    fits = vals < 1 << 32
+    if fits.any():
+        result[idx[fits]] = _miller_rabin_u32(vals[fits].astype(np.uint64))
+    for i, v in zip(idx[~fits].tolist(), vals[~fits].tolist(), strict=True):
+        result[i] = is_prime(v)
+    return result.reshape(arr.shape)
+
+
+# trial-division variants are not timed above these bounds
+_TRIAL_LIMITS = {
+    "is_primev1": 10**7,
+    "is_primev2": 10**7,
+    "is_primev3": 10**7,
+    "is_primev4": 10**14,
+    "is_primev5": 10**14,
+    "is_primev6": 10**14,
+    "is_primev7": 10**14,
+}
+
+
 def main(n: int, num_times: int):
     funcs = {
         "is_primev1": is_primev1,
@@ -125,11 +424,15 @@ def main(n: int, num_times: int):
         "is_primev5": is_primev5,
         "is_primev6": is_primev6,
         "is_primev7": is_primev7,
+        "is_prime": is_prime,
     }
 
     times = {}
 
     for name, func in funcs.items():
+        if n > _TRIAL_LIMITS.get(name, n):
+            print(f"Skipping function {name} (n too large)")
+            continue
         print(f"Testing function {name}")
 
         mean = 0
@@ -147,11 +450,8 @@ def main(n: int, num_times: int):
     # sort by time
     times_sorted = dict(sorted(times.items(), key=lambda x: x[1]))
 
-    # get name of fastest function
-    fastest_name = next(iter(times_sorted))
-
-    # execute the fastest function to see the primality of the number
-    prime = funcs[fastest_name](n)
+    # the shared engine gives the answer for any size of n
+    prime = is_prime(n)
 
     print()
     print(f"Elapsed time by function to verify the primality of the number {n}")
@@ -165,4 +465,5 @@ def main(n: int, num_times: int):
     print(f"The number {n} is {'prime' if prime else 'composite'}.")
 
 
-main(2**20 - 1, 2000)
+if __name__ == "__main__":
+    main(2**20 - 1, 2000)
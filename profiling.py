@@ -0,0 +1,145 @@
+"""
+Profiling helpers shared by the CLIs (`--profile`).
+
+- "sample": a background thread samples the stack of the profiled thread
+  every `interval` seconds; writes <out>.collapsed (flamegraph.pl /
+  speedscope / inferno compatible: "root;...;leaf count" per line)
+- "cprofile": deterministic cProfile; writes <out>.prof (pstats)
+
+Both print a top-N table to stderr. Only the calling process is profiled
+(pool workers are not).
+"""
+
+import cProfile
+import os
+import pstats
+import sys
+import threading
+from collections import Counter
+from time import perf_counter
+
+PROFILE_MODES = ("sample", "cprofile")
+
+
+def _frame_label(code) -> str:
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+class StackSampler:
+    """Counts the stacks seen in thread `ident` every `interval` seconds."""
+
+    def __init__(self, ident: int, interval: float = 0.001):
+        self.ident = ident
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        labels: dict = {}
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.ident)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                label = labels.get(code)
+                if label is None:
+                    label = labels[code] = _frame_label(code)
+                stack.append(label)
+                frame = frame.f_back
+            stack.reverse()
+            self.stacks[";".join(stack)] += 1
+            self.samples += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def write_collapsed(self, path: str) -> None:
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def top(self, n: int = 20) -> list[tuple[str, int, int]]:
+        """(function, self samples, inclusive samples), by self samples."""
+        own: Counter = Counter()
+        total: Counter = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            own[frames[-1]] += count
+            for label in set(frames):
+                total[label] += count
+        return [(label, c, total[label]) for label, c in own.most_common(n)]
+
+
+def _print_sampler_table(sampler: StackSampler, top: int, stream) -> None:
+    samples = max(sampler.samples, 1)
+    print(
+        f"\n[profile] {sampler.samples} samples every {sampler.interval * 1e3:g} ms",
+        file=stream,
+    )
+    print(f"{'self%':>7} {'total%':>7}  function", file=stream)
+    for label, own, total in sampler.top(top):
+        print(
+            f"{100 * own / samples:7.2f} {100 * total / samples:7.2f}  {label}",
+            file=stream,
+        )
+
+
+def profile_call(
+    fn,
+    *args,
+    mode: str = "sample",
+    out: str = "profile",
+    top: int = 20,
+    interval: float = 0.001,
+    stream=None,
+    **kwargs,
+):
+    """Run fn(*args, **kwargs) under the chosen profiler and return its result."""
+    if stream is None:
+        stream = sys.stderr
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"unknown profile mode: {mode!r}")
+    t0 = perf_counter()
+    if mode == "cprofile":
+        prof = cProfile.Profile()
+        try:
+            return prof.runcall(fn, *args, **kwargs)
+        finally:
+            path = out + ".prof"
+            prof.dump_stats(path)
+            print(
+                f"\n[profile] cProfile {perf_counter() - t0:.2f}s -> {path}",
+                file=stream,
+            )
+            pstats.Stats(prof, stream=stream).sort_stats("cumulative").print_stats(top)
+
+    sampler = StackSampler(threading.get_ident(), interval)
+    sampler.start()
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        sampler.stop()
+        path = out + ".collapsed"
+        sampler.write_collapsed(path)
+        _print_sampler_table(sampler, top, stream)
+        print(f"[profile] {perf_counter() - t0:.2f}s -> {path}", file=stream)
+
+
+def add_profile_arguments(parser) -> None:
+    """--profile MODE, --profile-out PREFIX, --profile-top N for argparse CLIs."""
+    parser.add_argument(
+        "--profile",
+        choices=PROFILE_MODES,
+        default=None,
+        help="profile the run (sample: collapsed stacks, cprofile: .prof)",
+    )
+    parser.add_argument("--profile-out", default="profile", help="output prefix")
+    parser.add_argument("--profile-top", type=int, default=20)
@@ -1,4 +1,10 @@
 import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import compress
+from math import isqrt
+from typing import Iterator
+
+import numpy as np
 
 
 # O(n²)
@@ -43,20 +49,202 @@ def sievev3(n: int) -> list[int]:
     return primes
 
 
-n = 100
+# odd-only: índice i representa o número 2*i + 1
+def _base_primes(limit: int) -> list[int]:
+    if limit < 2:
+        return []
+    size = (limit - 1) // 2 + 1
+    flags = bytearray(b"\x01") * size
+    flags[0] = 0
+    for i in range(1, (isqrt(limit) - 1) // 2 + 1):
+        if flags[i]:
+            p = 2 * i + 1
+            start = p * p // 2
+            flags[start::p] = bytes(len(range(start, size, p)))
+    return [2] + [2 * i + 1 for i in compress(range(size), flags)]
+
+
+# ~ 256 KiB por segmento (cabe no L2)
+SEGMENT_BYTES = 1 << 18
+
+
+def _sieve_odd_segment(lo: int, hi: int, base: list[int]) -> bytearray:
+    """
+    Marca os ímpares lo, lo+2, ... < hi (lo ímpar): flags[i] != 0 se lo + 2*i
+    é primo. `base` são os primos ímpares até √hi.
+    """
+    size = (hi - lo + 1) // 2
+    flags = bytearray(b"\x01") * size
+    if lo == 1 and size:
+        flags[0] = 0
+    for p in base:
+        start = p * p
+        if start >= hi:
+            break
+        if start < lo:
+            start = lo + (-lo) % p
+            if start % 2 == 0:
+                start += p
+        idx = (start - lo) // 2
+        flags[idx::p] = bytes(len(range(idx, size, p)))
+    return flags
+
+
+def _segments(n: int, segment_bytes: int) -> Iterator[tuple[int, bytearray]]:
+    """
+    Crivo segmentado só de ímpares: gera (lo, flags), onde flags[i] != 0 se
+    lo + 2*i é primo. A memória fica limitada a um segmento + primos base (√n).
+    """
+    base = _base_primes(isqrt(n))[1:]
+    span = 2 * segment_bytes
+    for lo in range(3, n + 1, span):
+        yield lo, _sieve_odd_segment(lo, min(lo + span, n + 1), base)
+
+
+def iter_primes(n: int, segment_bytes: int = SEGMENT_BYTES) -> Iterator[int]:
+    """Gera os primos <= n em ordem, com memória limitada (segmentado)."""
+    if n < 2:
+        return
+    yield 2
+    for lo, flags in _segments(n, segment_bytes):
+        yield from compress(range(lo, lo + 2 * len(flags), 2), flags)
+
+
+def primes_array(n: int, segment_bytes: int = SEGMENT_BYTES) -> np.ndarray:
+    """Primos <= n como array NumPy int64."""
+    if n < 2:
+        return np.zeros(0, dtype=np.int64)
+    parts = [np.array([2], dtype=np.int64)]
+    for lo, flags in _segments(n, segment_bytes):
+        idx = np.flatnonzero(np.frombuffer(flags, dtype=np.uint8))
+        parts.append(idx.astype(np.int64) * 2 + lo)
+    return np.concatenate(parts)
+
+
+def iter_odd_bitmap(limit: int, segment_bytes: int = SEGMENT_BYTES) -> Iterator[bytes]:
+    """
+    Bitmap compactado dos ímpares < limit (limit múltiplo de 16): o bit i
+    (ordem little-endian dentro de cada byte) indica se 2*i + 1 é primo.
+    Gerado em pedaços, para ser gravado em disco sem montar tudo na memória.
+    """
+    if limit % 16:
+        raise ValueError("limit must be a multiple of 16")
+    base = _base_primes(isqrt(limit))[1:]
+    span = 16 * max(1, segment_bytes // 8)
+    for lo in range(1, limit, span):
+        flags = _sieve_odd_segment(lo, min(lo + span, limit), base)
+        bits = np.frombuffer(flags, dtype=np.uint8)
+        yield np.packbits(bits, bitorder="little").tobytes()
+
+
+# O(n log log n), memória O(√n + segmento)
+def sievev4(n: int) -> list[int]:
+    return list(iter_primes(n))
+
+
+# ---------- crivo de intervalos multi-processo ----------
+# primos base por processo do pool (enviados uma vez pelo initializer)
+_pool_base: list[int] = []
+
+
+def _init_range_worker(base: list[int]) -> None:
+    global _pool_base
+    _pool_base = base
+
+
+def _range_task(task: tuple[int, int, bool]) -> int | tuple[int, int, bytes]:
+    """Crivo de um segmento [lo, hi) ímpar: contagem ou bitset compactado."""
+    lo, hi, count_only = task
+    flags = _sieve_odd_segment(lo, hi, _pool_base)
+    if count_only:
+        return len(flags) - flags.count(0)
+    packed = np.packbits(np.frombuffer(flags, dtype=np.uint8)).tobytes()
+    return lo, len(flags), packed
+
+
+def _range_tasks(
+    lo: int, hi: int, count_only: bool, segment_bytes: int
+) -> list[tuple[int, int, bool]]:
+    start = max(lo, 3) | 1
+    span = 2 * segment_bytes
+    return [(s, min(s + span, hi + 1), count_only) for s in range(start, hi + 1, span)]
+
+
+def _run_range(
+    lo: int, hi: int, count_only: bool, workers: int | None, segment_bytes: int
+) -> list:
+    base = _base_primes(isqrt(hi))[1:]
+    tasks = _range_tasks(lo, hi, count_only, segment_bytes)
+    if workers == 1 or len(tasks) <= 1:
+        _init_range_worker(base)
+        return [_range_task(t) for t in tasks]
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_range_worker, initargs=(base,)
+    ) as pool:
+        return list(pool.map(_range_task, tasks))
+
+
+def primes_in_range(
+    lo: int, hi: int, workers: int | None = None, segment_bytes: int = SEGMENT_BYTES
+) -> np.ndarray:
+    """
+    Primos em [lo, hi] (inclusivo) como array NumPy int64.
+    Os segmentos são distribuídos num pool de processos; cada worker recebe os
+    primos base (até √hi) uma vez e devolve um bitset compactado (packbits).
+    """
+    if hi < max(lo, 2):
+        return np.zeros(0, dtype=np.int64)
+    parts = [np.array([2], dtype=np.int64)] if lo <= 2 <= hi else []
+    for seg_lo, size, packed in _run_range(lo, hi, False, workers, segment_bytes):
+        bits = np.unpackbits(np.frombuffer(packed, dtype=np.uint8), count=size)
+        parts.append(np.flatnonzero(bits).astype(np.int64) * 2 + seg_lo)
+    if not parts:
+        return np.zeros(0, dtype=np.int64)
+    return np.concatenate(parts)
+
+
+def count_primes(
+    lo: int, hi: int, workers: int | None = None, segment_bytes: int = SEGMENT_BYTES
+) -> int:
+    """Quantidade de primos em [lo, hi] (inclusivo); workers só devolvem contagens."""
+    if hi < max(lo, 2):
+        return 0
+    total = 1 if lo <= 2 <= hi else 0
+    return total + sum(_run_range(lo, hi, True, workers, segment_bytes))
+
+
+# o harness só roda como script: workers do pool (spawn) reimportam o módulo
+if __name__ == "__main__":
+    n = 100
+
+    startv1 = time.perf_counter()
+    primesv1 = sievev1(n)
+    elapsedv1 = time.perf_counter() - startv1
+
+    startv2 = time.perf_counter()
+    primesv2 = sievev2(n)
+    elapsedv2 = time.perf_counter() - startv2
 
-startv1 = time.perf_counter()
-primesv1 = sievev1(n)
-elapsedv1 = time.perf_counter() - startv1
+    startv3 = time.perf_counter()
+    primesv3 = sievev3(n)
+    elapsedv3 = time.perf_counter() - startv3
 
-startv2 = time.perf_counter()
-primesv2 = sievev2(n)
-elapsedv2 = time.perf_counter() - startv2
+    startv4 = time.perf_counter()
+    primesv4 = sievev4(n)
+    elapsedv4 = time.perf_counter() - startv4
 
-startv3 = time.perf_counter()
-primesv3 = sievev3(n)
-elapsedv3 = time.perf_counter() - startv3
+    print(primesv1, round(elapsedv1, 10))
+    print(primesv2, round(elapsedv2, 10))
+    print(primesv3, round(elapsedv3, 10))
+    print(primesv4, round(elapsedv4, 10))
 
-print(primesv1, round(elapsedv1, 10))
-print(primesv2, round(elapsedv2, 10))
-print(primesv3, round(elapsedv3, 10))
+    # crossover: sievev3 (divisão por tentativa) x count_primes (segmentado)
+    print()
+    print("n\tsievev3\tcount_primes")
+    for size in (10, 100, 1_000, 10_000, 100_000):
+        t0 = time.perf_counter()
+        sievev3(size)
+        t1 = time.perf_counter()
+        count_primes(2, size, workers=1)
+        t2 = time.perf_counter()
+        print(f"{size}\t{t1 - t0:.6f}\t{t2 - t1:.6f}")
@@ -3,6 +3,7 @@
 """
 Benchmark adaptativo para funções principais.
 CLI: python bench_module.py bench <target> [args...] [--min-time T] [--max-iters N] [--clear-cache]
+     [--profile sample|cprofile] [--profile-out PREFIX]
 Targets:
   neighbors W H
   bfs W H comp_size
@@ -17,6 +18,7 @@ from functools import lru_cache
 from time import perf_counter
 
 from polyominoes import ominoes_dict
+from profiling import PROFILE_MODES, profile_call
 
 
 # ---------------------- core utilities (from your code) ----------------------
@@ -496,6 +498,7 @@ def usage():
     print(
         "Usage: python test.py bench <target> [args...] [--min-time T] [--max-iters N] [--clear-cache]"
     )
+    print("       [--profile sample|cprofile] [--profile-out PREFIX]")
     print("Targets:")
     print("  neighbors W H")
     print("  bfs W H comp_size")
@@ -505,11 +508,32 @@ def usage():
     sys.exit(1)
 
 
+def pop_flag_value(args, flag):
+    """Remove `flag VALUE` from args and return VALUE (usage if it is missing)."""
+    i = args.index(flag)
+    if i + 1 >= len(args):
+        print(f"error: {flag} needs a value")
+        usage()
+    value = args[i + 1]
+    del args[i : i + 2]
+    return value
+
+
 def main(argv):
     if len(argv) < 2 or argv[1] != "bench":
         print("error 1")
         usage()
     args = argv[2:]
+    # --profile MODE [--profile-out PREFIX]: rerun the same command under the profiler
+    if "--profile" in args:
+        mode = pop_flag_value(args, "--profile")
+        if mode not in PROFILE_MODES:
+            print(f"error: --profile must be one of {', '.join(PROFILE_MODES)}")
+            usage()
+        out = "profile"
+        if "--profile-out" in args:
+            out = pop_flag_value(args, "--profile-out")
+        return profile_call(main, argv[:2] + args, mode=mode, out=out)
     # defaults
     min_time = 0.5
     max_iters = 1000000
@@ -517,13 +541,9 @@ def main(argv):
 
     # parse global flags from tail
     if "--min-time" in args:
-        i = args.index("--min-time")
-        min_time = float(args[i + 1])
-        del args[i : i + 2]
+        min_time = float(pop_flag_value(args, "--min-time"))
     if "--max-iters" in args:
-        i = args.index("--max-iters")
-        max_iters = int(args[i + 1])
-        del args[i : i + 2]
+        max_iters = int(pop_flag_value(args, "--max-iters"))
     if "--clear-cache" in args:
         clear_cache_flag = True
         args.remove("--clear-cache")
@@ -0,0 +1,36 @@
+from time import perf_counter
+
+import pytest
+
+import battleship
+
+SHOTS = [(2, 3, False), (1, 1, True), (4, 2, False), (0, 4, False), (3, 3, True)]
+
+
+@pytest.mark.parametrize(
+    "rows, cols, fleet, allow_touch",
+    [(6, 6, [3, 2, 2], True), (6, 6, [3, 2, 2], False), (6, 5, [3, 2, 1], False)],
+)
+def test_heatmap_shots_match_from_scratch(rows, cols, fleet, allow_touch):
+    hm = battleship.FleetHeatmap(rows, cols, fleet, allow_touch)
+    total, _ = hm.compute()
+    assert total == battleship.count_fleet_configurations(
+        rows, cols, fleet, allow_touch=allow_touch
+    )
+    for r, c, hit in SHOTS:
+        hm.shoot(r, c, hit)
+        fresh = battleship.FleetHeatmap(
+            rows, cols, fleet, allow_touch, hm.hits, hm.misses
+        )
+        assert hm.compute() == fresh.compute()
+
+
+def test_heatmap_shot_time_limit():
+    # refresh after every shot: 7x7 is well inside the supported sizes
+    hm = battleship.FleetHeatmap(7, 7, [4, 3, 2], allow_touch=False)
+    hm.compute()
+    for r, c, hit in SHOTS:
+        hm.shoot(r, c, hit)
+        t0 = perf_counter()
+        hm.compute()
+        assert perf_counter() - t0 < 2.0
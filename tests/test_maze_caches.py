@@ -0,0 +1,60 @@
+import json
+from random import Random
+
+import pentomino_maze_opt as maze
+from polyominoes import ominoes_dict
+
+W, H = 8, 8
+
+
+def _score_some(k: int = 16) -> None:
+    shapes = maze.generate_free_polyominoes(5, ominoes_dict)
+    placements = maze.build_global_placements(shapes, W, H)
+    rng = Random(1)
+    for _ in range(k):
+        occ = maze.random_feasible_selection(placements, 8, True, rng)[1]
+        maze.score_selection(occ, W, H)
+
+
+def test_snapshot_leaves_cache_stats_alone(tmp_path):
+    maze.clear_caches()
+    _score_some()
+    before = maze.cache_stats()
+    maze.snapshot_caches(str(tmp_path / "caches.json"))
+    assert maze.cache_stats() == before
+
+
+def test_snapshot_round_trip(tmp_path):
+    maze.clear_caches()
+    _score_some()
+    file = str(tmp_path / "caches.json")
+    maze.snapshot_caches(file, ["compute"])
+    expected = maze._dump_compute()
+    maze.clear_caches()
+    assert maze.warm_caches(file, ["compute"]) == len(expected)
+    assert maze._dump_compute() == expected
+
+
+def test_tracked_lru_results_are_capped():
+    results = {}
+    cached = maze._tracked_lru(lambda x: x * x, {}, results, 2)
+    for x in (1, 2, 3):
+        cached(x)
+    assert results == {(2,): 4, (3,): 9}
+
+
+def test_warm_skips_scores_from_another_scorer_version(tmp_path):
+    maze.clear_caches()
+    _score_some()
+    file = tmp_path / "caches.json"
+    maze.snapshot_caches(str(file))
+    data = json.loads(file.read_text())
+    assert data["version"] == maze.SCORER_VERSION
+    data["version"] = maze.SCORER_VERSION - 1
+    file.write_text(json.dumps(data))
+    maze.clear_caches()
+    maze.warm_caches(str(file))
+    sizes = {row["name"]: row["size"] for row in maze.cache_stats()}
+    assert sizes["compute"] == 0
+    assert sizes["component"] == 0
+    assert sizes["neighbors"] > 0
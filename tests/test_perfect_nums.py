@@ -0,0 +1,33 @@
+import pytest
+
+import perfect_nums
+from odd_perfect import odd_perfect_possible
+
+
+def _odd_survivor() -> int:
+    """Smallest odd n > 10**1500 that clears the whole odd-perfect cascade."""
+    n = 10**1500 + 1
+    while not odd_perfect_possible(n):
+        n += 2
+    return n
+
+
+def test_is_perfectv6_small():
+    perfect = [n for n in range(1, 10_000) if perfect_nums.is_perfectv6(n)]
+    assert perfect == [6, 28, 496, 8128]
+
+
+def test_is_perfectv6_odd_survivor_does_not_trial_divide():
+    with pytest.raises(ValueError):
+        perfect_nums.is_perfectv6(_odd_survivor())
+
+
+def test_is_perfect_matches_v6():
+    for n in range(1, 10_000):
+        assert perfect_nums.is_perfect(n) == perfect_nums.is_perfectv6(n)
+    assert perfect_nums.is_perfect((1 << 126) * ((1 << 127) - 1))
+
+
+def test_is_perfect_odd_survivor_does_not_factorize():
+    with pytest.raises(ValueError):
+        perfect_nums.is_perfect(_odd_survivor())